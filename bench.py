@@ -0,0 +1,636 @@
+# coding=utf-8
+# Python 3
+
+"""
+🏷️ BENCHMARKS
+👔 Igor Perković
+
+🚀 Created: 2026-10-19 11:52:30
+📅 Changed: 2026-10-20 11:27:45
+
+⚙️ Prerequisites:
+------------------------------
+    pandas, numpy, openpyxl, xlsxwriter, sqlalchemy, rapidfuzz
+
+📃 Description:
+--------------------------------------------------------------------------
+Benchmarks for hot paths of du and fi on synthetic data: xlsx reading,
+cleaning, export, fuzzy matching, replacing with 5000 keys (compiled
+replacer and chained replace_many), file copy/split and SQLite loading.
+
+Every case is timed `repeat` times (median, min, CPU time) and once more
+with tracemalloc for peak memory. Results are saved as JSON, so runs from
+different commits can be compared (on the fastest run):
+
+    python bench.py --size small --out base.json
+    ... change code ...
+    python bench.py --size small --out new.json --baseline base.json
+
+Exit code is 1 when some case is slower than baseline by more than
+--threshold (default 0.2 = 20 %).
+
+    python bench.py --xlsx-engines
+
+compares xlsx reading engines (openpyxl, calamine) with get_xlsx.
+
+    python bench.py --passwords
+
+measures up.get_password lookup latency as the password store grows.
+
+    python bench.py --imports
+
+checks that importing du, fi, db, up or tm stays under --import-budget
+seconds and loads none of the heavy libraries (HEAVY).
+
+"""
+import io
+import json
+import time
+import platform
+import tempfile
+import tracemalloc
+import contextlib
+from pathlib import Path
+from datetime import datetime
+
+
+# Data sizes: frame rows and columns, fuzzy source and match list lengths, number of files,
+# replacer dictionary keys and texts
+SIZES = {
+    'small':  {'rows': 2000,   'cols': 10, 'source': 200,  'match': 2000,  'files': 50,   'file_kb': 16,
+               'keys': 5000, 'texts': 2000},
+    'medium': {'rows': 20000,  'cols': 10, 'source': 1000, 'match': 10000, 'files': 300,  'file_kb': 64,
+               'keys': 5000, 'texts': 10000},
+    'large':  {'rows': 200000, 'cols': 20, 'source': 5000, 'match': 50000, 'files': 2000, 'file_kb': 64,
+               'keys': 5000, 'texts': 50000},
+}
+
+# Registered benchmark cases: name -> function(ctx, i)
+CASES = {}
+
+
+def case(name):
+    # Registers function as benchmark case
+    def wrap(f):
+        CASES[name] = f
+        return f
+    return wrap
+
+
+def fake_names(n, seed=0):
+    """
+    🏷 Synthetic company-like names for fuzzy matching
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    syllables = np.array(['ka', 'ro', 'me', 'tin', 'vel', 'sa', 'dor', 'pri', 'lu', 'zag', 'ne', 'bo'])
+    forms = np.array(['d.o.o.', 'd.d.', 'j.d.o.o.', 'obrt', 'Ltd', 'GmbH'])
+    names = []
+    for k in range(n):
+        word = ''.join(syllables[rng.integers(0, len(syllables), rng.integers(2, 5))])
+        other = ''.join(syllables[rng.integers(0, len(syllables), 2)])
+        names.append(f'{word.title()} {other} {forms[k % len(forms)]}')
+    return names
+
+
+def bench_frame(rows, cols, seed=0):
+    """
+    🏷 Synthetic DataFrame for benchmarks (text, int, float, date and sparse columns)
+    """
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    data = {}
+    for c in range(cols):
+        kind = c % 5
+        if kind == 0:
+            words = np.array(['Zagreb', 'Split', 'Rijeka', 'Osijek', 'Zadar', 'Pula', ' Varaždin '])
+            data[f'Text {c}'] = words[rng.integers(0, len(words), rows)]
+        elif kind == 1:
+            data[f'Int {c}'] = rng.integers(0, 1000000, rows)
+        elif kind == 2:
+            data[f'Float {c}'] = rng.random(rows) * 1000
+        elif kind == 3:
+            data[f'Date {c}'] = pd.Timestamp('2020-01-01') + pd.to_timedelta(rng.integers(0, 2000, rows), unit='D')
+        else:
+            v = rng.random(rows) * 100
+            v[rng.random(rows) < 0.3] = np.nan
+            data[f'Sparse {c}'] = v
+    return pd.DataFrame(data)
+
+
+def prepare(tmp, size='small', seed=0):
+    """
+    ==================================================
+
+    🏷 Creates input data for all cases in tmp folder
+
+    🎯 RETURNS
+    ――――――――――――――――――――――――――――――――――――――――――――――――――
+    → ctx (dict) with frames, files and lists used by the cases
+    """
+    import numpy as np
+    from sqlalchemy import create_engine
+
+    s = SIZES[size]
+    tmp = Path(tmp)
+    rng = np.random.default_rng(seed)
+
+    df = bench_frame(s['rows'], s['cols'], seed)
+    xlsx = tmp / 'bench.xlsx'
+    df.to_excel(xlsx, index=False, sheet_name='Data')
+
+    # Dirty copy for cleaning: empty rows, duplicates, spaces in column names
+    dirty = df.copy()
+    dirty.columns = [f' {c} ' for c in dirty.columns]
+    dirty = dirty.astype({c: object for c in dirty.columns if c.strip().startswith('Text')})
+    dirty.iloc[::50] = None
+    dirty = dirty.iloc[np.r_[0:len(dirty), 0:len(dirty) // 10]]
+
+    src = tmp / 'files'
+    src.mkdir()
+    files = []
+    for k in range(s['files']):
+        sub = src / f'dir_{k % 10}'
+        sub.mkdir(exist_ok=True)
+        fn = sub / f'file_{k}.bin'
+        fn.write_bytes(rng.bytes(int(s['file_kb'] * 1024 * rng.random()) + 1))
+        files.append(fn)
+
+    match = fake_names(s['match'], seed)
+    picks = rng.integers(0, len(match), s['source'])
+    source = [match[p].lower().replace('a', 'e', 1) for p in picks]
+
+    # Random lowercase words: dictionary keys and texts of 30 words
+    letters = np.array(list('abcdefghijklmnopqrstuvwxyz'))
+    def word():
+        return ''.join(letters[rng.integers(0, 26, rng.integers(3, 9))])
+    keys = {word() for _ in range(s['keys'])}
+    replace = {k: k.upper() for k in keys}
+    texts = [' '.join(word() for _ in range(30)) for _ in range(s['texts'])]
+
+    return {'tmp': tmp, 'df': df, 'dirty': dirty, 'xlsx': xlsx, 'files': files, 'src': src,
+            'source': source, 'match': match, 'replace': replace, 'texts': texts,
+            'engine': create_engine(f"sqlite:///{tmp / 'bench_sa.db'}")}
+
+
+# Cases
+#--------------------------------------------------
+@case('du.get_xlsx_data')
+def _(ctx, i):
+    import du
+    return du.get_xlsx_data(ctx['xlsx'], 'Data')
+
+
+@case('du.get_xlsx')
+def _(ctx, i):
+    import du
+    return du.get_xlsx(ctx['xlsx'])
+
+
+@case('du.clean_df')
+def _(ctx, i):
+    import du
+    return du.clean_df(ctx['dirty'])
+
+
+@case('du.df_2_xlsx')
+def _(ctx, i):
+    import du
+    return du.df_2_xlsx(ctx['df'], ctx['tmp'] / f'export_{i}.xlsx', 'Data')
+
+
+@case('du.df_2_sqlite')
+def _(ctx, i):
+    import du
+    return du.df_2_sqlite(ctx['df'], ctx['tmp'] / 'bench.db', 'data', ifexist='replace', index=False)
+
+
+@case('du.xlsx_2_db')
+def _(ctx, i):
+    import du
+    return du.xlsx_2_db(ctx['xlsx'], ctx['engine'], None, 'data', sn='Data', ifexist='replace')
+
+
+@case('fi.fuzzy_compare_lists')
+def _(ctx, i):
+    import fi
+    return fi.fuzzy_compare_lists(ctx['source'], ctx['match'], 3, fast=1, batch=1000)
+
+
+@case('fi.fuzzy_compare_lists index')
+def _(ctx, i):
+    import fi
+    index = fi.fuzzy_index(ctx['match'])
+    return fi.fuzzy_compare_lists(ctx['source'], None, 3, fast=1, index=index)
+
+
+@case('fi.get_replacer')
+def _(ctx, i):
+    import fi
+    fi.clear_replacers()    # compiling is part of the cost
+    replacer = fi.get_replacer(ctx['replace'])
+    return [replacer(t) for t in ctx['texts']]
+
+
+@case('fi.replace_many chained')
+def _(ctx, i):
+    import fi
+    return [fi.replace_many(t, ctx['replace'], chained=1) for t in ctx['texts']]
+
+
+@case('fi.split_by_size')
+def _(ctx, i):
+    import fi
+    return fi.split_by_size(ctx['src'], [f.relative_to(ctx['src']) for f in ctx['files']], 1, mode='ffd')
+
+
+@case('fi.cp_multi_2_one')
+def _(ctx, i):
+    import fi
+    dst = ctx['tmp'] / f'copy_{i}'
+    dst.mkdir()
+    return fi.cp_multi_2_one([str(f) for f in ctx['files']], dst)
+
+
+# Runner
+#--------------------------------------------------
+def xlsx_engine_benchmark(shapes=((1000, 10), (20000, 10), (5000, 50)), **kwargs):
+    """
+    ==================================================
+
+    🏷 Compares xlsx reading engines on generated workbooks
+
+    Every workbook has text, integer, float, date and partly empty columns
+    and two header rows. Each engine reads it with get_xlsx (merged headers,
+    sn_col and clean on) and the result is compared with the first engine.
+
+    📌 ARGUMENTS:
+    ――――――――――――――――――――――――――――――――――――――――――――――――――
+    - shapes  (list)  (rows, columns) of generated workbooks
+    - engines (list)  Engines to compare (default: openpyxl and calamine if installed)
+    - folder  (Path)  Folder for generated files (default: temporary folder)
+    - repeat  (int)   Best of n runs (default 1)
+
+    🎯 RETURNS
+    ――――――――――――――――――――――――――――――――――――――――――――――――――
+    → DataFrame: shape, engine, seconds, rows/s, same result as the first engine
+    """
+
+    import pandas as pd
+    from timeit import default_timer as timer
+    import du
+
+    engines = kwargs.get('engines', None)
+    if engines is None:
+        engines = ['openpyxl'] + (['calamine'] if du.xlsx_engine('auto') == 'calamine' else [])
+    repeat = kwargs.get('repeat', 1)
+
+    tmp = None
+    folder = kwargs.get('folder', None)
+    if folder is None:
+        tmp = tempfile.TemporaryDirectory()
+        folder = tmp.name
+    folder = Path(folder)
+
+    acc = []
+    for rows, cols in shapes:
+        fn = folder / f'bench_{rows}x{cols}.xlsx'
+        df = bench_frame(rows, cols)
+        header = pd.MultiIndex.from_arrays([[f'GROUP {c // 5}' for c in range(cols)], list(df.columns)])
+        df.columns = header
+        with contextlib.redirect_stdout(io.StringIO()):
+            df.to_excel(fn, sheet_name='Data')
+
+        base = None
+        for e in engines:
+            best = None
+            for _ in range(repeat):
+                start = timer()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    res = du.get_xlsx(fn, header_rows=2, sn_col='Sheet', clean=1, engine=e)
+                t = timer() - start
+                best = t if best is None else min(best, t)
+
+            if base is None:
+                base = res
+            same = res.shape == base.shape and list(res.columns) == list(base.columns) and \
+                   res.astype(str).equals(base.astype(str))
+            acc.append([f'{rows}x{cols}', e, round(best, 3), round(rows / best), same])
+
+    if tmp is not None:
+        tmp.cleanup()
+
+    res = pd.DataFrame(acc, columns=['Shape', 'Engine', 'Seconds', 'Rows/s', 'Same as first'])
+    print(res.to_string(index=False))
+    return res
+
+
+def password_lookup_benchmark(sizes=(100, 1000, 10000, 100000), lookups=2000):
+    """
+    ==================================================
+
+    🏷 Lookup latency of up.get_password (without cache) as the store grows
+
+    Tables without index on ID are compared with tables made by init_store.
+
+    📌 ARGUMENTS:
+    ――――――――――――――――――――――――――――――――――――――――――――――――――
+    - sizes   (list)  Number of stored passwords
+    - lookups (int)   Random lookups per store
+
+    🎯 RETURNS
+    ――――――――――――――――――――――――――――――――――――――――――――――――――
+    → list of rows: [store size, schema, µs per lookup]
+    """
+
+    import random
+    import sqlite3
+    from timeit import default_timer as timer
+    import up
+
+    plain = '''CREATE TABLE about(ID, comment, timestamp);
+                CREATE TABLE keys(ID, keys);
+                CREATE TABLE hash(ID, hash);'''
+
+    # Encryption is the slow part of inserting, reuse a few secrets
+    secrets = [up._encrypt(f'password {i}') for i in range(10)]
+
+    res = []
+    for n in sizes:
+        for schema in ('no index', 'init_store'):
+            conn = sqlite3.connect(':memory:')
+            if schema == 'no index':
+                conn.executescript(plain)
+            else:
+                up.init_store(conn)
+            with conn:
+                conn.executemany('INSERT INTO keys(ID, keys) VALUES (?,?);', ((i, secrets[i % 10][0]) for i in range(n)))
+                conn.executemany('INSERT INTO hash(ID, hash) VALUES (?,?);', ((i, secrets[i % 10][1]) for i in range(n)))
+
+            ids = [random.randrange(n) for _ in range(lookups)]
+            start = timer()
+            for i in ids:
+                up.get_password(conn, i, ttl=0)
+            us = (timer() - start) / lookups * 1e6
+            conn.close()
+
+            res.append([n, schema, round(us, 1)])
+            print(f'{n:>8} | {schema:<10} | {round(us, 1)} µs per lookup')
+
+    return res
+
+
+def measure(f, ctx, repeat=3):
+    """
+    ==================================================
+
+    🏷 Times one case
+
+    Output of the case (prints) is suppressed. Peak memory is measured in
+    an extra run, because tracemalloc slows the code down.
+
+    🎯 RETURNS
+    ――――――――――――――――――――――――――――――――――――――――――――――――――
+    → dict with seconds (median), min, cpu (median) and peak_mb
+    """
+    import statistics
+
+    wall, cpu = [], []
+    for i in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            t, c = time.perf_counter(), time.process_time()
+            f(ctx, i)
+            wall.append(time.perf_counter() - t)
+            cpu.append(time.process_time() - c)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        tracemalloc.start()
+        try:
+            f(ctx, repeat)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    return {'seconds': round(statistics.median(wall), 4), 'min': round(min(wall), 4),
+            'cpu': round(statistics.median(cpu), 4), 'peak_mb': round(peak / 2**20, 2)}
+
+
+def git_commit():
+    # Short hash of the checked out commit (empty outside git)
+    import subprocess
+
+    try:
+        res = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=Path(__file__).parent,
+                             capture_output=True, text=True, timeout=10)
+        return res.stdout.strip()
+    except Exception:
+        return ''
+
+
+def run(size='small', repeat=3, cases=None, seed=0):
+    """
+    ==================================================
+
+    🏷 Runs benchmark cases
+
+    📌 ARGUMENTS:
+    ――――――――――――――――――――――――――――――――――――――――――――――――――
+    - size    (str)  small | medium | large (see SIZES)
+    - repeat  (int)  Timed runs per case (default 3)
+    - cases   (list) Case names or name prefixes like 'fi.' (default all)
+    - seed    (int)  Seed for synthetic data
+
+    🎯 RETURNS
+    ――――――――――――――――――――――――――――――――――――――――――――――――――
+    → dict with meta data and results per case
+    """
+    names = [n for n in CASES if not cases or any(n.startswith(c) for c in cases)]
+
+    res = {'meta': {'date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'), 'commit': git_commit(),
+                    'python': platform.python_version(), 'platform': platform.platform(),
+                    'size': size, 'repeat': repeat, 'seed': seed},
+           'results': {}}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f'Preparing {size} data in {tmp}...')
+        ctx = prepare(tmp, size, seed)
+        for name in names:
+            try:
+                r = measure(CASES[name], ctx, repeat)
+            except Exception as ex:
+                r = {'error': f'{type(ex).__name__}: {ex}'}
+            res['results'][name] = r
+            if 'error' in r:
+                print(f"  {name:<32} ❌ {r['error']}")
+            else:
+                print(f"  {name:<32} {r['seconds']:>9.4f} s  (min {r['min']:.4f} s, cpu {r['cpu']:.4f} s)  {r['peak_mb']:>9.2f} MB")
+        ctx['engine'].dispose()
+
+    return res
+
+
+def save(res, fn):
+    with open(fn, 'w', encoding='utf-8') as f:
+        json.dump(res, f, indent=2)
+
+
+def load(fn):
+    with open(fn, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compare(base, new, threshold=0.2):
+    """
+    ==================================================
+
+    🏷 Compares two benchmark runs
+
+    📌 ARGUMENTS:
+    ――――――――――――――――――――――――――――――――――――――――――――――――――
+    - base      (dict) Results from run() or load()
+    - new       (dict) Results from run() or load()
+    - threshold (float) Allowed slowdown, 0.2 = 20 % (default)
+
+    🎯 RETURNS
+    ――――――――――――――――――――――――――――――――――――――――――――――――――
+    → List of regressed case names (slower over threshold, or failing
+      in new run while working in baseline)
+    """
+    regressions = []
+    print(f"\nBaseline {base['meta'].get('commit', '')} ({base['meta']['date']}) → "
+          f"{new['meta'].get('commit', '')} ({new['meta']['date']})")
+
+    for name, r in new['results'].items():
+        b = base['results'].get(name)
+        if not b or 'error' in b:
+            continue
+        if 'error' in r:
+            # Worked in baseline, fails now
+            regressions.append(name)
+            print(f"  {name:<32} {b['min']:>9.4f} → ERROR  🔺 REGRESSION  {r['error']}")
+            continue
+        # min of the runs is less noisy than median
+        ratio = r['min'] / b['min'] if b['min'] else 1
+        mem = r['peak_mb'] - b['peak_mb']
+        flag = ''
+        if ratio > 1 + threshold:
+            regressions.append(name)
+            flag = '🔺 REGRESSION'
+        elif ratio < 1 - threshold:
+            flag = '🔻 faster'
+        print(f"  {name:<32} {b['min']:>9.4f} → {r['min']:>9.4f} s  x{ratio:.2f}  {mem:+.2f} MB  {flag}")
+
+    return regressions
+
+
+# Heavy libraries which must not be loaded by plain `import du` (or fi, db, up, tm)
+HEAVY = ('pandas', 'numpy', 'sqlalchemy', 'openpyxl', 'xlsxwriter', 'rapidfuzz', 'cryptography',
+         'python_calamine', 'tabulate', 'pyodbc', 'cx_Oracle', 'psycopg2')
+
+
+def import_budget(modules=('du', 'fi', 'db', 'up', 'tm'), seconds=0.1, repeat=3):
+    """
+    ==================================================
+
+    🏷 Checks import time and loaded libraries of the modules
+
+    Every module is imported in a fresh interpreter with -X importtime,
+    the best of `repeat` runs is compared with the budget.
+
+    📌 ARGUMENTS:
+    ――――――――――――――――――――――――――――――――――――――――――――――――――
+    - modules (list)  Module names
+    - seconds (float) Budget for import time of one module (default 0.1)
+    - repeat  (int)   Fresh interpreters per module (default 3)
+
+    🎯 RETURNS
+    ――――――――――――――――――――――――――――――――――――――――――――――――――
+    → List of problems (empty list = within budget)
+    """
+    import os
+    import sys
+    import subprocess
+
+    env = dict(os.environ)
+    env.pop('PYTHONDONTWRITEBYTECODE', None)    # bytecode compilation is not import time
+    problems = []
+
+    for m in modules:
+        code = (f'import sys, json; sys.path.insert(0, {str(Path(__file__).parent)!r}); import {m}; '
+                f'print(json.dumps(sorted({{k.split(".")[0] for k in sys.modules}})))')
+        best = None
+        for _ in range(repeat):
+            r = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                               capture_output=True, text=True, env=env, timeout=120)
+            if r.returncode:
+                problems.append(f'{m}: import failed\n{r.stderr[-500:]}')
+                break
+            us = [int(line.split('|')[1]) for line in r.stderr.splitlines()
+                  if line.startswith('import time:') and line.split('|')[-1].strip() == m]
+            if us:
+                best = us[0] if best is None else min(best, us[0])
+            heavy = sorted(set(json.loads(r.stdout.splitlines()[-1])) & set(HEAVY))
+        else:
+            s = (best or 0) / 1e6
+            print(f"  import {m:<4} {s:>8.4f} s  {'loads ' + ', '.join(heavy) if heavy else ''}")
+            if s > seconds:
+                problems.append(f'{m}: import takes {round(s, 4)} s, budget is {seconds} s')
+            if heavy:
+                problems.append(f"{m}: loads {', '.join(heavy)} at import")
+
+    return problems
+
+
+def main(argv=None):
+    import argparse
+
+    p = argparse.ArgumentParser(description='df_utils benchmarks')
+    p.add_argument('--size', default='small', choices=list(SIZES))
+    p.add_argument('--repeat', type=int, default=3)
+    p.add_argument('--cases', nargs='*', help='case names or prefixes, e.g. du. fi.fuzzy')
+    p.add_argument('--out', help='save results to JSON file')
+    p.add_argument('--baseline', help='compare with results in JSON file')
+    p.add_argument('--threshold', type=float, default=0.2)
+    p.add_argument('--list', action='store_true', help='list cases')
+    p.add_argument('--imports', action='store_true', help='check import time and libraries loaded at import')
+    p.add_argument('--xlsx-engines', action='store_true', help='compare xlsx reading engines (xlsx_engine_benchmark)')
+    p.add_argument('--passwords', action='store_true', help='password lookup latency (password_lookup_benchmark)')
+    p.add_argument('--import-budget', type=float, default=0.1, help='seconds per module import')
+    args = p.parse_args(argv)
+
+    if args.list:
+        print('\n'.join(CASES))
+        return 0
+
+    if args.xlsx_engines:
+        xlsx_engine_benchmark(repeat=args.repeat)
+        return 0
+
+    if args.passwords:
+        password_lookup_benchmark()
+        return 0
+
+    if args.imports:
+        problems = import_budget(seconds=args.import_budget)
+        for pr in problems:
+            print(f'❌ {pr}')
+        return 1 if problems else 0
+
+    res = run(args.size, args.repeat, args.cases)
+    if args.out:
+        save(res, args.out)
+        print(f'\nResults saved in {args.out}')
+
+    if args.baseline:
+        regressions = compare(load(args.baseline), res, args.threshold)
+        if regressions:
+            print(f'\n❌ {len(regressions)} regression(s) over {int(args.threshold * 100)} %')
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -5,13 +5,16 @@
 👔 by Igor Perković
 
 🛠 CREATED: 2020-10-13 08:39:29
-📆 CHANGED: 2022-04-10 00:26:38
+📆 CHANGED: 2026-10-19 12:48:06
 
 ---
 ⚙ PREREQUISITES:
 📘 Libraries: cx_Oracle, pyodbc, sqlalchemy
 
 """
+import logging
+
+log = logging.getLogger(__name__)
 
 
 def mssqlsrv(hostname, database, **kwargs):
@@ -66,9 +69,7 @@ def mssqlsrv(hostname, database, **kwargs):
         conn_string = conn_string_base+";Trusted_Connection=Yes;"
 
     try:
-        print('📢 CONNECTING TO:')
-        print('   Hostname   :', hostname)
-        print('   Database   :', database)
+        log.info(f'📢 Connecting to: {hostname} | {database}')
 
         if mode == 'conn':
             import pyodbc
@@ -76,8 +77,7 @@ def mssqlsrv(hostname, database, **kwargs):
             # SQL Server Database Connection
             result = pyodbc.connect(conn_string, autocommit=ac)
 
-            print('   Mode       : CONNECTION')
-            print('   Autocommit : {ac}')
+            log.debug(f'Mode: CONNECTION | Autocommit: {ac}')
 
             c = result.cursor()
 
@@ -90,20 +90,19 @@ def mssqlsrv(hostname, database, **kwargs):
             params = urllib.parse.quote(conn_string)
             result  = create_engine(f"mssql+pyodbc:///?odbc_connect={params}")
 
-            print('   Mode       : ENGINE')
+            log.debug('Mode: ENGINE')
 
             conn = result.raw_connection()
             c = conn.cursor()
 
         c.execute('SELECT @@version')
         res = c.fetchall()
-        print('✅ ',res[0][0])
+        log.info(f'✅ {res[0][0]}')
 
         return result
 
     except Exception as ex:
-        print('----------------------------------------------------------------')
-        print('❌ DB Connection ERROR ❌\n  ',ex)
+        log.error(f'❌ DB Connection ERROR: {ex}')
 
 def oracle(hostname, database, **kwargs):
     """
@@ -148,8 +147,7 @@ def oracle(hostname, database, **kwargs):
             password = v
 
     try:
-        print('📢 Connecting to:', hostname, database)
-        print('----------------------------------------------------------------')
+        log.info(f'📢 Connecting to: {hostname} | {database}')
 
         if mode == 'conn':
             import cx_Oracle
@@ -164,9 +162,7 @@ def oracle(hostname, database, **kwargs):
             result = cur.fetchone()
             cur.close()
 
-            print('📢 DB Connection SUCCESS on:', database)
-            print('----------------------------------------------------------------------------\n')
-            print(result[0])
+            log.info(f'✅ DB Connection SUCCESS on: {database} | {result[0]}')
 
             return conn
 
@@ -185,8 +181,8 @@ def oracle(hostname, database, **kwargs):
                 )
             )
             return engine
-    except:
-            print('DB Connection ERROR\n')
+    except Exception as ex:
+            log.error(f'❌ DB Connection ERROR: {ex}')
 
 def postgresql(hostname, database, **kwargs):
     import psycopg2 as pg
@@ -213,9 +209,7 @@ def postgresql(hostname, database, **kwargs):
             password = v
 
     try:
-        print('📢 CONNECTING TO:')
-        print('   Hostname :', hostname)
-        print('   Database :', database)
+        log.info(f'📢 Connecting to: {hostname} | {database}')
 
         if mode == 'conn':
             #  Define database connection
@@ -224,13 +218,13 @@ def postgresql(hostname, database, **kwargs):
             # Checking database connection
             #-----------------------------------------------------
             c = result.cursor()
-            print('   Mode     : CONNECTION')
+            log.debug('Mode: CONNECTION')
 
         if mode == 'engine':
             from sqlalchemy import create_engine
 
             result = create_engine(f"postgresql+psycopg2://{username}:{password}@{hostname}/{database}")
-            print('   Mode     : ENGINE')
+            log.debug('Mode: ENGINE')
 
             conn = result.raw_connection()
             c = conn.cursor()
@@ -242,13 +236,12 @@ def postgresql(hostname, database, **kwargs):
         #table = [['Hostname',hostname],['Database',database],['Mode','ENGINE']]
         #print(tabulate(table, tablefmt='psql'))
 
-        print(f'✅ {data[0]}\n')
+        log.info(f'✅ {data[0]}')
 
         return result
 
     except Exception as ex:
-        print('----------------------------------------------------------------')
-        print('❌ DB Connection ERROR ❌\n  ',ex)
+        log.error(f'❌ DB Connection ERROR: {ex}')
 
 def exec_query(conn, query_list):
     c = conn.cursor()
@@ -6,22 +6,51 @@
 👔 by Igor Perkovic
 
 🛠 CREATED: 2020-10-13 08:39:29
-📆 CHANGED: 2024-03-27 21:00:06
+📆 CHANGED: 2026-10-20 11:06:40
 
 ---
 ⚙ PREREQUISITES:
 📘 Libraries: xlsxwriter, pandas, sqlalchemy
 
 """
+import logging
 from datetime import datetime, timedelta
 from pathlib import Path
-import numpy as np
-import pandas as pd
+
+try:
+    from . import tm
+except ImportError:
+    import tm
+
+log = logging.getLogger(__name__)
+
+
+class _LazyModule:
+    # Imports module on first attribute access and puts it in place of
+    # itself in module globals, so later calls use the module directly
+    def __init__(self, name, alias):
+        self._name = name
+        self._alias = alias
+
+    def __getattr__(self, attr):
+        import importlib
+
+        mod = importlib.import_module(self._name)
+        globals()[self._alias] = mod
+        return getattr(mod, attr)
+
+    def __repr__(self):
+        return f'<lazy module {self._name!r}>'
+
+
+# pandas and numpy are imported with the first function which needs them
+np = _LazyModule('numpy', 'np')
+pd = _LazyModule('pandas', 'pd')
 
 
 
 # Databases
-def df_2_mssqlsrv(df, engine_name, schema_name, table_name, ifexist):
+def df_2_mssqlsrv(df, engine_name, schema_name, table_name, ifexist, **kwargs):
     """
     ====================================
 
@@ -37,24 +66,293 @@ def df_2_mssqlsrv(df, engine_name, schema_name, table_name, ifexist):
     - ifexist      (str) fail    = just throw an error and stop
                          replace = replace existing table with a new data
                          append  = apeend to existing table
+                         upsert  = update changed and insert new rows by key columns (see df_upsert)
+    - keys         (list[str]) Key columns for upsert
 
 
     🎯 RETURNS
     ―――――――――――――――――――――――――――――――――――――――――――――――――
     → SQL Server table data
+      (upsert returns dict with inserted, updated and unchanged row counts)
     """
-    print('Inserting into database...')
+    if ifexist == 'upsert':
+        if not kwargs.get('keys'):
+            raise ValueError("keys= (key column names) is required for ifexist='upsert'")
+        return df_upsert(df, engine_name, schema_name, table_name, kwargs['keys'])
+
+    log.info(f'Inserting {len(df)} rows into {table_name}...')
 
     # Optimal chunk-size for SQL Server import
     chunk_size=999//(df.shape[1]+1)
 
     try:
         df.to_sql(name=table_name, con=engine_name, schema=schema_name, index=False, if_exists=ifexist, chunksize=chunk_size, method='multi')
-        print(f'Successfully INSERTED table: {table_name}\n')
-    except:
-        print(f'INSERT FAILED for {table_name}')
+        log.info(f'Successfully INSERTED table: {table_name}')
+    except Exception as ex:
+        log.error(f'INSERT FAILED for {table_name}: {ex}')
 
-def df_2_sqlite(df, db_path, table_name):
+def df_upsert(df, engine_name, schema_name, table_name, keys):
+    """
+    ====================================
+
+    🏷 Upsert (MERGE) of DataFrame into existing table by key columns
+
+    DataFrame is bulk loaded into a temporary staging table (#table on
+    SQL Server, TEMP TABLE elsewhere, so no CREATE rights in the target
+    schema are needed), then the target table is merged set-based in the
+    same transaction:
+    - SQL Server: MERGE ... OUTPUT $action
+    - other databases (PostgreSQL, SQLite): UPDATE ... FROM + INSERT ... WHERE NOT EXISTS
+    Only rows where some non-key column differs are updated.
+    If the target table does not exist, it is created.
+    Rows with duplicate keys in DataFrame are reduced to the last one.
+
+    📌 ARGUMENTS:
+    ―――――――――――――――――――――――――――――――――――――――――――――――――
+    - df           (DataFrame)
+    - engine_name  (SQLAlchemy engine)
+    - schema_name  (str) Schema name (None = default)
+    - table_name   (str) Table name
+    - keys         (list[str]) Key columns
+
+    🎯 RETURNS
+    ―――――――――――――――――――――――――――――――――――――――――――――――――
+    → dict: inserted, updated, unchanged
+    """
+    import uuid
+    from sqlalchemy import inspect, text
+
+    if isinstance(keys, str):
+        keys = [keys]
+    if not keys:
+        raise ValueError('keys= (key column names) is required for upsert')
+
+    df = df.drop_duplicates(subset=keys, keep='last')
+    cols = list(df.columns)
+    values = [c for c in cols if c not in keys]
+
+    dialect = engine_name.dialect.name
+    q = engine_name.dialect.identifier_preparer.quote
+    prefix = q(schema_name) + '.' if schema_name else ''
+    target = prefix + q(table_name)
+    stage_name = f'{table_name}_stage_{uuid.uuid4().hex[:8]}'
+    if dialect == 'mssql':
+        stage_name = '#' + stage_name
+    stage = q(stage_name)
+
+    chunk_size = max(1, 999//(df.shape[1]+1))
+    res = {'inserted': 0, 'updated': 0, 'unchanged': 0}
+
+    log.info(f'Upserting {len(df)} rows into {target}...')
+
+    with engine_name.begin() as conn:
+        if not inspect(conn).has_table(table_name, schema=schema_name):
+            df.to_sql(name=table_name, con=conn, schema=schema_name, index=False, chunksize=chunk_size, method='multi')
+            res['inserted'] = len(df)
+            log.info(f'Created table {target}: {res}')
+            return res
+
+        # Temporary staging table with column types of the target
+        col_list = ', '.join(q(c) for c in cols)
+        if dialect == 'mssql':
+            # UNION ALL, so an IDENTITY column does not stay IDENTITY in the copy
+            conn.execute(text(f'SELECT {col_list} INTO {stage} FROM {target} WHERE 1 = 0 '
+                              f'UNION ALL SELECT {col_list} FROM {target} WHERE 1 = 0'))
+        else:
+            conn.execute(text(f'CREATE TEMP TABLE {stage} AS SELECT {col_list} FROM {target} WHERE 1 = 0'))
+        df.to_sql(name=stage_name, con=conn, index=False, if_exists='append', chunksize=chunk_size, method='multi')
+
+        on = ' AND '.join(f't.{q(k)} = s.{q(k)}' for k in keys)
+
+        if dialect == 'mssql':
+            matched = ''
+            if values:
+                s_vals = ', '.join(f's.{q(c)}' for c in values)
+                t_vals = ', '.join(f't.{q(c)}' for c in values)
+                sets = ', '.join(f't.{q(c)} = s.{q(c)}' for c in values)
+                matched = f'WHEN MATCHED AND EXISTS (SELECT {s_vals} EXCEPT SELECT {t_vals}) THEN UPDATE SET {sets}'
+
+            row = conn.execute(text(f"""
+                SET NOCOUNT ON;
+                DECLARE @changes TABLE (action NVARCHAR(10));
+                MERGE INTO {target} AS t
+                USING {stage} AS s ON {on}
+                {matched}
+                WHEN NOT MATCHED BY TARGET THEN
+                    INSERT ({col_list}) VALUES ({', '.join(f's.{q(c)}' for c in cols)})
+                OUTPUT $action INTO @changes;
+                SELECT COALESCE(SUM(CASE WHEN action = 'INSERT' THEN 1 ELSE 0 END), 0),
+                       COALESCE(SUM(CASE WHEN action = 'UPDATE' THEN 1 ELSE 0 END), 0)
+                FROM @changes;
+            """)).fetchone()
+            res['inserted'], res['updated'] = int(row[0]), int(row[1])
+
+        else:
+            if values:
+                if dialect == 'sqlite':
+                    differs = ' OR '.join(f'NOT (t.{q(c)} IS s.{q(c)})' for c in values)
+                else:
+                    differs = ' OR '.join(f't.{q(c)} IS DISTINCT FROM s.{q(c)}' for c in values)
+                sets = ', '.join(f'{q(c)} = s.{q(c)}' for c in values)
+                r = conn.execute(text(f'UPDATE {target} AS t SET {sets} FROM {stage} AS s WHERE {on} AND ({differs})'))
+                res['updated'] = r.rowcount
+
+            r = conn.execute(text(f"""
+                INSERT INTO {target} ({col_list})
+                SELECT {', '.join(f's.{q(c)}' for c in cols)} FROM {stage} AS s
+                WHERE NOT EXISTS (SELECT 1 FROM {target} AS t WHERE {on})
+            """))
+            res['inserted'] = r.rowcount
+
+        conn.execute(text(f'DROP TABLE {stage}'))
+
+    res['unchanged'] = len(df) - res['inserted'] - res['updated']
+    log.info(f'Successfully UPSERTED table {target}: {res}')
+
+    return res
+
+def df_2_oracle(df, conn, table_name, ifexist='fail', **kwargs):
+    """
+    ====================================
+
+    🏷 Bulk insert of DataFrame into Oracle table with array binding
+
+    Rows are sent with cursor.executemany in batches, bind types are set
+    once with setinputsizes from DataFrame dtypes.
+
+    ⚙ PREREQUISITES:
+    ―――――――――――――――――――――――――――――――――――――――――――――――――
+    pip install oracledb   (or cx_Oracle)
+
+    📌 ARGUMENTS:
+    ―――――――――――――――――――――――――――――――――――――――――――――――――
+    - df         (DataFrame)
+    - conn       (engine | connection) from db.oracle (engine or conn mode)
+    - table_name (str) Table name
+    - ifexist    (str) fail    = just throw an error and stop
+                       replace = drop and create table with a new data
+                       append  = append to existing table (created if missing)
+
+    - schema     (str)  Table owner (default: connected user)
+    - batch      (int)  Rows per executemany call (default 50000)
+    - direct     (int)  1 = direct-path insert (/*+ APPEND_VALUES */),
+                        commit after every batch
+
+    🎯 RETURNS
+    ―――――――――――――――――――――――――――――――――――――――――――――――――
+    → Number of inserted rows
+    """
+    import re
+    from timeit import default_timer as timer
+
+    try:
+        import oracledb as ora
+    except ImportError:
+        import cx_Oracle as ora
+
+    schema = kwargs.get('schema', None)
+    batch = kwargs.get('batch', 50000)
+    direct = kwargs.get('direct', 0)
+
+    def q(name):
+        # Plain names stay case-insensitive (upper case), others are quoted
+        name = str(name)
+        if re.fullmatch(r'[A-Za-z][A-Za-z0-9_$#]{0,127}', name):
+            return name.upper()
+        return '"' + name.replace('"', '""') + '"'
+
+    def db_type(name, fallback):
+        return getattr(ora, name, None) or getattr(ora, fallback)
+
+    full_name = (q(schema) + '.' if schema else '') + q(table_name)
+
+    # Columns: DDL type, bind type and values
+    #-----------------------------------------
+    ddl, sizes, data = [], [], []
+    for c in range(df.shape[1]):
+        col = df.iloc[:, c]
+        kind = col.dtype.kind if isinstance(col.dtype, np.dtype) else 'x'
+
+        if kind in 'iu' or str(col.dtype) in ('Int8', 'Int16', 'Int32', 'Int64', 'UInt8', 'UInt16', 'UInt32', 'UInt64'):
+            ddl.append('NUMBER(19)')
+            sizes.append(db_type('DB_TYPE_NUMBER', 'NUMBER'))
+        elif kind == 'b' or str(col.dtype) == 'boolean':
+            ddl.append('NUMBER(1)')
+            sizes.append(db_type('DB_TYPE_NUMBER', 'NUMBER'))
+            col = col.astype('Int8')
+        elif kind == 'f' or str(col.dtype).startswith('Float'):
+            ddl.append('BINARY_DOUBLE')
+            sizes.append(db_type('DB_TYPE_BINARY_DOUBLE', 'NATIVE_FLOAT'))
+        elif kind == 'M' or isinstance(col.dtype, pd.DatetimeTZDtype):
+            if isinstance(col.dtype, pd.DatetimeTZDtype):
+                col = col.dt.tz_localize(None)
+            ddl.append('TIMESTAMP')
+            sizes.append(db_type('DB_TYPE_TIMESTAMP', 'TIMESTAMP'))
+            col = pd.Series(col.dt.to_pydatetime(), index=col.index, dtype=object)
+        else:
+            col = col.where(col.isna(), col.astype(str))
+            n = int(col.str.len().max()) if col.notna().any() else 1
+            if n <= 4000:
+                ddl.append(f'VARCHAR2({max(n, 1)} CHAR)')
+                sizes.append(max(n, 1))
+            else:
+                ddl.append('CLOB')
+                sizes.append(db_type('DB_TYPE_CLOB', 'CLOB'))
+
+        values = col.astype(object)
+        data.append(values.where(col.notna(), None).tolist())
+
+    cols = ', '.join(q(c) for c in df.columns)
+    binds = ', '.join(f':{i+1}' for i in range(df.shape[1]))
+    hint = '/*+ APPEND_VALUES */ ' if direct else ''
+    insert = f'INSERT {hint}INTO {full_name} ({cols}) VALUES ({binds})'
+
+    raw = conn.raw_connection() if hasattr(conn, 'raw_connection') else conn
+    cur = raw.cursor()
+
+    try:
+        cur.execute("SELECT COUNT(*) FROM all_tables WHERE owner = NVL(:o, USER) AND table_name = :t",
+                    o=q(schema).strip('"') if schema else None, t=q(table_name).strip('"'))
+        exists = cur.fetchone()[0] > 0
+
+        if exists and ifexist == 'fail':
+            raise ValueError(f'Table {full_name} already exists')
+        if exists and ifexist == 'replace':
+            cur.execute(f'DROP TABLE {full_name} PURGE')
+            exists = False
+        if not exists:
+            columns = ',\n    '.join(f'{q(c)} {t}' for c, t in zip(df.columns, ddl))
+            cur.execute(f'CREATE TABLE {full_name} (\n    {columns}\n)')
+
+        log.info(f'Inserting {len(df)} rows into {full_name}...')
+        start = timer()
+        p = tm.progress(len(df), 'Inserting', unit='rows', logger=log)
+
+        cur.setinputsizes(*sizes)
+        rows = list(zip(*data))
+        for i in range(0, len(rows), batch):
+            cur.executemany(insert, rows[i:i+batch])
+            if direct:
+                raw.commit()
+            p.update(len(rows[i:i+batch]))
+        raw.commit()
+
+        elapsed = timer() - start
+        log.info(f'Successfully INSERTED {len(rows)} rows into {full_name} '
+                 f'in {round(elapsed, 2)} s | {round(len(rows) / max(elapsed, 1e-9))} rows/s')
+        return len(rows)
+
+    except Exception as ex:
+        raw.rollback()
+        log.error(f'INSERT FAILED for {full_name}: {ex}')
+        return 0
+
+    finally:
+        cur.close()
+        if raw is not conn:
+            raw.close()
+
+def df_2_sqlite(df, db_path, table_name, **kwargs):
     """
     ====================================
 
@@ -66,25 +364,356 @@ def df_2_sqlite(df, db_path, table_name):
     - db_path    (Path) Database name with path
     - table_name (str)  Table name
 
+    - ifexist    (str)  fail (default) | replace | append
+    - index      (bool) Write DataFrame index as a column (default True)
+
     🎯 RETURNS
     ―――――――――――――――――――――――――――――――――――――――――――――――――
     → SQLite file (database)
     """
     from sqlalchemy import create_engine
 
+    ifexist = kwargs.get('ifexist', 'fail')
+    index = kwargs.get('index', True)
+
     engine = create_engine(f'sqlite:///{db_path}', echo=False)
-    sqlite_connection = engine.connect()
 
     try:
-        df.to_sql(table_name, sqlite_connection, if_exists='fail')
-        print(f'Successfully created database {db_path} and table {table_name}')
-    except:
-        print('ERROR creating SQLite database !')
+        with engine.begin() as sqlite_connection:
+            df.to_sql(table_name, sqlite_connection, if_exists=ifexist, index=index)
+        log.info(f'Successfully created database {db_path} and table {table_name}')
+    except Exception as ex:
+        log.error(f'ERROR creating SQLite database: {ex}')
+    finally:
+        engine.dispose()
+
+
+# Parallel extraction
+def sql_partition_bounds(engine_name, table_name, column, partitions=4, **kwargs):
+    """
+    ====================================
+
+    🏷 Boundaries for key-range partitions of a table
+
+    Reads MIN and MAX of partition column and splits the range into
+    equal parts. Works for numeric and date/datetime columns.
+
+    📌 ARGUMENTS:
+    ―――――――――――――――――――――――――――――――――――――――――――――――――
+    - engine_name (SQLAlchemy engine)
+    - table_name  (str)
+    - column      (str) Numeric or date column
+    - partitions  (int)
+
+    - schema      (str) Schema name
+    - where       (str) Extra SQL filter
+
+    🎯 RETURNS
+    ―――――――――――――――――――――――――――――――――――――――――――――――――
+    → List of partitions+1 boundaries (empty list if the table is empty)
+    """
+    from sqlalchemy import text
+
+    source, col, where = _sql_parts(engine_name, table_name, column, kwargs)
+
+    with engine_name.connect() as conn:
+        lo, hi = conn.execute(text(f'SELECT MIN({col}), MAX({col}) FROM {source}{where}')).fetchone()
+
+    if lo is None:
+        return []
+
+    if isinstance(lo, (int, float, np.number)) and not isinstance(lo, bool):
+        bounds = np.linspace(float(lo), float(hi), partitions + 1)
+        if isinstance(lo, (int, np.integer)):
+            bounds = np.unique(np.round(bounds).astype(np.int64))
+        return bounds.tolist()
+
+    import decimal
+    if isinstance(lo, decimal.Decimal):
+        return np.linspace(float(lo), float(hi), partitions + 1).tolist()
+
+    # Dates (SQLite returns them as text)
+    lo, hi = pd.Timestamp(lo), pd.Timestamp(hi)
+    return [t.to_pydatetime() for t in pd.date_range(lo, hi, periods=partitions + 1)]
+
+
+def _sql_parts(engine_name, table_name, column, kwargs):
+    # Quoted table (with schema), quoted column and WHERE clause
+    q = engine_name.dialect.identifier_preparer.quote
+    schema = kwargs.get('schema', None)
+    source = (q(schema) + '.' if schema else '') + q(table_name)
+    where = kwargs.get('where', None)
+    return source, q(column), f' WHERE ({where})' if where else ''
+
+
+def sql_partitions(engine_name, table_name, column, **kwargs):
+    """
+    ====================================
+
+    🏷 Reads table in key-range partitions with parallel queries
+
+    Every partition is one range query on its own pooled connection:
+        first   column <  b1
+        middle  b(i) <= column < b(i+1)
+        last    column >= b(n-1)
+        nulls   column IS NULL
+    so every row is read exactly once.
+
+    📌 ARGUMENTS:
+    ―――――――――――――――――――――――――――――――――――――――――――――――――
+    - engine_name (SQLAlchemy engine)
+    - table_name  (str)
+    - column      (str)  Numeric or date partition column
+
+    - partitions  (int)  Number of range partitions (default 4)
+    - bounds      (list) Own boundaries instead of MIN/MAX split
+    - workers     (int)  Parallel queries (default = partitions, but not more than
+                         free connections of the engine pool, pool_size + max_overflow)
+    - columns     (list) Selected columns (default all)
+    - schema      (str)  Schema name
+    - where       (str)  Extra SQL filter
+    - nulls       (int)  1 = read rows with NULL partition column too (default)
+    - ordered     (int)  1 = yield partitions in key order (default),
+                         0 = yield partitions as they finish
+
+    🎯 RETURNS
+    ―――――――――――――――――――――――――――――――――――――――――――――――――
+    → Generator of (partition number, DataFrame)
+    """
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+    from sqlalchemy import text
+    from sqlalchemy.pool import QueuePool
+
+    partitions = kwargs.get('partitions', 4)
+    bounds = kwargs.get('bounds', None)
+    if bounds is None:
+        bounds = sql_partition_bounds(engine_name, table_name, column, partitions,
+                                      schema=kwargs.get('schema', None), where=kwargs.get('where', None))
+
+    q = engine_name.dialect.identifier_preparer.quote
+    source, col, where = _sql_parts(engine_name, table_name, column, kwargs)
+    columns = kwargs.get('columns', None)
+    select = ', '.join(q(c) for c in columns) if columns else '*'
+    extra = f" AND ({kwargs['where']})" if kwargs.get('where') else ''
+
+    # Inner boundaries split the rows, outer ones are open (no rows lost on MIN/MAX)
+    inner = list(bounds)[1:-1]
+    queries = []
+    if len(bounds):
+        edges = [None] + inner + [None]
+        for i in range(len(edges) - 1):
+            cond, params = [], {}
+            if edges[i] is not None:
+                cond.append(f'{col} >= :lo')
+                params['lo'] = edges[i]
+            if edges[i + 1] is not None:
+                cond.append(f'{col} < :hi')
+                params['hi'] = edges[i + 1]
+            if not cond:
+                cond.append(f'{col} IS NOT NULL')
+            queries.append((f"SELECT {select} FROM {source} WHERE {' AND '.join(cond)}{extra}", params))
+    if kwargs.get('nulls', 1):
+        queries.append((f'SELECT {select} FROM {source} WHERE {col} IS NULL{extra}', {}))
+
+    def read(job):
+        sql, params = job
+        with engine_name.connect() as conn:
+            return pd.read_sql(text(sql), conn, params=params)
+
+    workers = kwargs.get('workers', None)
+    if not workers:
+        workers = max(1, len(queries))
+        # Waiting for a pooled connection longer than pool_timeout fails the run
+        pool = engine_name.pool
+        if isinstance(pool, QueuePool) and pool._max_overflow >= 0:
+            workers = min(workers, max(1, pool.size() + pool._max_overflow - pool.checkedout()))
+
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        tasks = [ex.submit(read, job) for job in queries]
+
+        if kwargs.get('ordered', 1):
+            for i, t in enumerate(tasks):
+                yield i, t.result()
+        else:
+            index = {t: i for i, t in enumerate(tasks)}
+            for t in as_completed(tasks):
+                yield index[t], t.result()
+
+
+def sql_2_df_partitioned(engine_name, table_name, column, **kwargs):
+    """
+    ====================================
+
+    🏷 Reads whole table with parallel key-range queries into one DataFrame
+
+    Same arguments as sql_partitions. Partitions are joined in key order.
+
+    🎯 RETURNS
+    ―――――――――――――――――――――――――――――――――――――――――――――――――
+    → DataFrame
+    """
+    from timeit import default_timer as timer
+
+    start = timer()
+    kwargs['ordered'] = 1
+    parts = [df for _, df in sql_partitions(engine_name, table_name, column, **kwargs)]
+    parts = [p for p in parts if len(p)] or parts[:1]
+    res = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame()
+
+    elapsed = timer() - start
+    log.info(f'Read {len(res)} rows from {table_name} in {len(parts)} partitions | '
+             f'{round(elapsed, 2)} s | {round(len(res) / max(elapsed, 1e-9))} rows/s')
+
+    return res
+
+
+# Change detection
+def df_row_hash(df, cols=None):
+    """
+    ====================================
+
+    🏷 Vectorized hash of every DataFrame row
+
+    📌 ARGUMENTS:
+    ―――――――――――――――――――――――――――――――――――――――――――――――――
+    - df   (DataFrame)
+    - cols (list[str])  Columns included in hash (default all)
+
+    🎯 RETURNS
+    ―――――――――――――――――――――――――――――――――――――――――――――――――
+    → Series of int64 hashes (same index as df)
+    """
+
+    part = df if cols is None else df[list(cols)]
+    h = pd.util.hash_pandas_object(part, index=False)
+    # int64, so hashes can be stored in any database
+    return pd.Series(h.to_numpy().view(np.int64), index=df.index)
+
+
+def df_changes(df, keys, store, table_name, **kwargs):
+    """
+    ====================================
+
+    🏷 Finds new, changed and deleted rows since the previous load
+
+    Row hashes (and key hashes) of the previous load are kept in table
+    <table_name>_row_hash in the target database (SQLAlchemy engine) or in
+    a local SQLite sidecar file (Path). Only returned rows need to be written.
+
+    📌 ARGUMENTS:
+    ―――――――――――――――――――――――――――――――――――――――――――――――――
+    - df         (DataFrame)  Current data
+    - keys       (list[str])  Key columns
+    - store      (engine | Path) Where hashes are kept
+    - table_name (str)        Name of loaded table
+
+    - cols       (list[str])  Columns compared (default all)
+    - save       (int)        1 = store current hashes now (default 0,
+                              call df_hashes_save after successful load)
+
+    🎯 RETURNS
+    ―――――――――――――――――――――――――――――――――――――――――――――――――
+    → dict:
+        new       (DataFrame)  rows with new keys
+        changed   (DataFrame)  rows with existing keys and changed values
+        deleted   (DataFrame)  keys which are not in df anymore
+        unchanged (int)        number of unchanged rows
+        hashes    (DataFrame)  current hashes for df_hashes_save
+    """
+
+    from sqlalchemy import create_engine, inspect
+
+    if isinstance(keys, str):
+        keys = [keys]
+    cols = kwargs.get('cols', None)
+
+    hashes = df[keys].copy()
+    hashes['key_hash'] = df_row_hash(df, keys)
+    hashes['row_hash'] = df_row_hash(df, cols)
+
+    engine = store if hasattr(store, 'dialect') else create_engine(f'sqlite:///{store}')
+    hash_table = f'{table_name}_row_hash'
+
+    if inspect(engine).has_table(hash_table):
+        prev = pd.read_sql_table(hash_table, engine)
+    else:
+        prev = pd.DataFrame({**{k: [] for k in keys}, 'key_hash': [], 'row_hash': []})
+    prev['key_hash'] = prev['key_hash'].astype(np.int64)
+
+    # Left merge keeps order and number of rows of df (previous keys are unique)
+    prev = prev.drop_duplicates('key_hash', keep='last')
+    cmp = hashes[['key_hash', 'row_hash']].reset_index(drop=True).merge(
+        prev[['key_hash', 'row_hash']], on='key_hash', how='left', suffixes=('', '_prev'), indicator=True)
+
+    is_new = (cmp['_merge'] == 'left_only').to_numpy()
+    is_changed = ((cmp['_merge'] == 'both') & (cmp['row_hash'] != cmp['row_hash_prev'])).to_numpy()
+
+    deleted = prev.loc[~prev['key_hash'].isin(hashes['key_hash']), keys].reset_index(drop=True)
+
+    res = {
+        'new':       df.iloc[np.flatnonzero(is_new)],
+        'changed':   df.iloc[np.flatnonzero(is_changed)],
+        'deleted':   deleted,
+        'unchanged': int(len(df) - is_new.sum() - is_changed.sum()),
+        'hashes':    hashes,
+    }
+    log.info(f"Changes in {table_name}: {len(res['new'])} new | {len(res['changed'])} changed | "
+             f"{len(deleted)} deleted | {res['unchanged']} unchanged")
+
+    if kwargs.get('save', 0):
+        df_hashes_save(hashes, engine, table_name)
+
+    if engine is not store:
+        engine.dispose()
+
+    return res
+
+
+def df_hashes_save(hashes, store, table_name):
+    """
+    🏷 Stores row hashes from df_changes after a successful load
+    """
+
+    from sqlalchemy import create_engine
+
+    engine = store if hasattr(store, 'dialect') else create_engine(f'sqlite:///{store}')
+    hashes.to_sql(f'{table_name}_row_hash', engine, if_exists='replace', index=False)
+    if engine is not store:
+        engine.dispose()
 
 
 
 # Excel
-def get_xlsx_data(fn, sn=''):
+def xlsx_engine(engine='auto'):
+    """
+    ==============================================
+
+    🏷 Chooses pandas engine for reading xlsx files
+
+    📌 ARGUMENTS:
+    ――――――――――――――――――――――――――――――――――――――――――――――
+    - engine (str) auto     = calamine (Rust reader, much faster) when
+                              python-calamine is installed and pandas >= 2.2,
+                              otherwise openpyxl (pandas opens it read-only)
+                   calamine | openpyxl = use this one
+
+    🎯 RETURNS
+    ――――――――――――――――――――――――――――――――――――――――――――――
+    → Engine name for pd.ExcelFile / pd.read_excel
+    """
+
+    if engine != 'auto':
+        return engine
+
+    import importlib.util
+
+    version = tuple(int(x) for x in pd.__version__.split('.')[:2])
+    if version >= (2, 2) and importlib.util.find_spec('python_calamine'):
+        return 'calamine'
+    return 'openpyxl'
+
+
+def get_xlsx_data(fn, sn='', engine='auto'):
     """
     ==============================================
 
@@ -94,6 +723,7 @@ def get_xlsx_data(fn, sn=''):
     ――――――――――――――――――――――――――――――――――――――――――――――
     - fn (Path) file  name
     - sb (Str)  sheet name (optional) # if left, first sheet would be used
+    - engine (str) auto | calamine | openpyxl (see xlsx_engine)
 
     🎯 RETURNS
     ――――――――――――――――――――――――――――――――――――――――――――――
@@ -101,32 +731,32 @@ def get_xlsx_data(fn, sn=''):
     """
 
 
-    print(f'\nTrying to read the data from {fn} to DataFrame')
+    log.debug(f'Trying to read the data from {fn} to DataFrame')
     try:
         if fn.is_file():
-            print(f'Found file: {fn.name} on provided path')
-            xlsx = pd.ExcelFile(fn)
+            log.debug(f'Found file: {fn.name} on provided path')
+            xlsx = pd.ExcelFile(fn, engine=xlsx_engine(engine))
             sheets = xlsx.sheet_names
 
             if len(sn):
                 if sn in sheets:
-                    df = pd.read_excel(fn, sheet_name = sn)
-                    print('Data successfully read!\n')
+                    df = xlsx.parse(sn)
+                    log.info(f'Data successfully read from {fn.name} [{sn}]')
                     return df
                 else:
-                    print(f'ERROR: Sheet name does not exist. Choose one of these: {sheets}')
+                    log.error(f'Sheet name does not exist. Choose one of these: {sheets}')
             else:
-                print(f"Reading first worksheet [{sheets[0]}]")
-                df = pd.read_excel(fn)
-                print('Data successfully read!\n')
+                log.debug(f'Reading first worksheet [{sheets[0]}]')
+                df = xlsx.parse(sheets[0])
+                log.info(f'Data successfully read from {fn.name} [{sheets[0]}]')
                 return df
 
         else:
-            print('ERROR (get_xlsx_data): File not found!')
+            log.error(f'get_xlsx_data: File not found: {fn}')
             raise Exception
 
-    except:
-        print(f'FAILED to read file {fn}\n')
+    except Exception as ex:
+        log.error(f'FAILED to read file {fn}: {ex}')
         return
 
 def df_merged_headers(cl, delimiter):
@@ -160,16 +790,20 @@ def get_xlsx(fn, **kwargs):
     collect     (Bool) Collect dataframes of all sheets into list of dataframes
     concatenate (Bool) Concatenate all work sheets
     to_pickle   (Bool) Save each worksheet in a pickle file
+    pickle_format (str) pickle (default) | npy | feather
+                        npy and feather are column files which open with
+                        memory mapping (see df_2_mmap / mmap_2_df)
     destination (Path) Path for saving pickle files
+    engine      (str)  auto | calamine | openpyxl (see xlsx_engine)
 
     🎯 RETURNS
     ――――――――――――――――――――――――――――――――――――――――――――――――――
     → List of DataFrames - one DataFrame from each worksheet
     """
 
-    xlsx = pd.ExcelFile(fn)
+    xlsx = pd.ExcelFile(fn, engine=xlsx_engine(kwargs.get('engine', 'auto')))
     sheets = xlsx.sheet_names
-    print(f'Reading data from: {fn}\nFound work sheets: {sheets}\n')
+    log.info(f'Reading data from: {fn} | Found work sheets: {sheets}')
 
     # Default values
     #-----------------
@@ -183,6 +817,7 @@ def get_xlsx(fn, **kwargs):
     p = 0 # pickle
     c = 0 # clean
     con = 0 # concatenate
+    pf = 'pickle' # pickle format
     dest_pick = Path('')
 
     # Get dynamic argument
@@ -209,6 +844,20 @@ def get_xlsx(fn, **kwargs):
             con = v
         if k == 'destination':
             dest_pick = v
+        if k == 'pickle_format':
+            pf = v
+
+    def save_pickle(df, name):
+        if pf == 'pickle':
+            tmp_pn = dest_pick / (name + '.pickle')
+            df.to_pickle(tmp_pn)
+        elif pf == 'feather':
+            tmp_pn = dest_pick / (name + '.feather')
+            df_2_mmap(df, tmp_pn, fmt='feather')
+        else:
+            tmp_pn = dest_pick / name
+            df_2_mmap(df, tmp_pn, fmt=pf)
+        return tmp_pn
 
     if nr > 1:
         src_headers = [i for i in range(nr)]
@@ -221,12 +870,11 @@ def get_xlsx(fn, **kwargs):
         work_sheets = sheets
 
     if collect:
-        print('Collecting DataFrames to a list is ON\n')
+        log.debug('Collecting DataFrames to a list is ON')
 
+    reporter = tm.progress(len(work_sheets), 'Reading worksheets', unit='sheets', logger=log)
     for ws in work_sheets:
-        print('Reading worksheet:',ws)
-        if src_headers:
-            print('Headers:', src_headers)
+        log.debug(f'Reading worksheet: {ws} | Headers: {src_headers}')
 
         df = xlsx.parse(ws, header=src_headers)
 
@@ -249,21 +897,21 @@ def get_xlsx(fn, **kwargs):
 
         # Save worksheets to pickle files
         if p > 0 and con == 0:
-            tmp_fn = fn.stem + '_' + ws + '.pickle'
-            tmp_pn = dest_pick / tmp_fn
-            df.to_pickle(tmp_pn)
-            print(f'Created: {tmp_pn}\n')
+            tmp_pn = save_pickle(df, fn.stem + '_' + ws)
+            log.info(f'Created: {tmp_pn}')
+
+        reporter.update()
+
+    reporter.close()
 
     if collect:
         if con:
-            print('\nConcatenating collected dataframes...')
+            log.debug('Concatenating collected dataframes...')
             res = pd.concat(dfs)
             res.columns = res.columns.str.replace('\n', '')
             if p:
-                tmp_fn = fn.stem + '_unified.pickle'
-                tmp_pn = dest_pick / tmp_fn
-                df.to_pickle(tmp_pn)
-                print(f'\nCreated {tmp_fn}\n')
+                tmp_pn = save_pickle(res, fn.stem + '_unified')
+                log.info(f'Created {tmp_pn.name}')
             else:
                 return res
         else:
@@ -272,6 +920,406 @@ def get_xlsx(fn, **kwargs):
         return df
 
 
+# Streaming
+def xlsx_chunks(fn, sn='', chunk=50000, **kwargs):
+    """
+    ==================================================
+
+    🏷 Reads worksheet in chunks of rows (openpyxl read-only mode)
+
+    Only one chunk of rows is in memory at a time.
+
+    📌 ARGUMENTS:
+    ――――――――――――――――――――――――――――――――――――――――――――――――――
+    - fn          (Path) Existing xlsx file
+    - sn          (str)  Sheet name (default first sheet)
+    - chunk       (int)  Rows per DataFrame (default 50000)
+    - header_rows (int)  Number of header rows, more rows are merged
+                         as in get_xlsx (default 1)
+    - delimiter   (str)  Delimiter for merged header names (default '-')
+
+    🎯 RETURNS
+    ――――――――――――――――――――――――――――――――――――――――――――――――――
+    → Generator of DataFrames with the same columns
+    """
+    from openpyxl import load_workbook
+
+    nr = kwargs.get('header_rows', 1)
+    delimiter = kwargs.get('delimiter', '-')
+
+    wb = load_workbook(fn, read_only=True, data_only=True)
+    try:
+        ws = wb[sn] if len(sn) else wb.worksheets[0]
+        rows = ws.iter_rows(values_only=True)
+
+        header = [next(rows, ()) for _ in range(max(nr, 1))]
+        width = max(len(h) for h in header)
+        header = [list(h) + [None] * (width - len(h)) for h in header]
+
+        if nr > 1:
+            columns = df_merged_headers(list(zip(*header)), delimiter)
+        else:
+            columns = [f'Unnamed: {i}' if h is None else str(h) for i, h in enumerate(header[0])]
+
+        acc = []
+        for r in rows:
+            acc.append(r[:width])
+            if len(acc) >= chunk:
+                yield pd.DataFrame(acc, columns=columns)
+                acc = []
+        if acc:
+            yield pd.DataFrame(acc, columns=columns)
+    finally:
+        wb.close()
+
+
+def clean_chunk(df, fillna=''):
+    """
+    ==================================
+
+    🏷 Cleans one chunk of streamed data
+
+    Like clean_df, but keeps all columns (every chunk must have the same
+    columns) and does not remove duplicates across chunks:
+    empty rows are removed, text is stripped, objects are normalized
+    (see df_normalize).
+
+    🎯 RETURNS
+    ――――――――――――――――――――――――――――――――――
+    → Clean DataFrame
+    """
+    res = df.dropna(how='all', axis=0)
+    res.columns = res.columns.str.strip()
+
+    for c in range(res.shape[1]):
+        col = res.iloc[:, c]
+        if col.dtype == object or pd.api.types.is_string_dtype(col.dtype):
+            res.isetitem(c, col.str.strip() if pd.api.types.infer_dtype(col, skipna=True) == 'string' else col)
+
+    res = df_normalize(res)
+    if len(fillna):
+        res = res.fillna(fillna)
+
+    return res.reset_index(drop=True)
+
+
+def xlsx_2_db(fn, engine_name, schema_name, table_name, **kwargs):
+    """
+    ==================================================
+
+    🏷 Streaming xlsx → database pipeline
+
+    Three stages run in parallel threads with bounded queues between them:
+        read (xlsx_chunks) → clean (clean_chunk) → write (to_sql)
+    Parsing of the next chunks overlaps with writing over network, and
+    bounded queues stop the reader when the writer is slower (backpressure),
+    so memory use stays at a few chunks.
+
+    📌 ARGUMENTS:
+    ――――――――――――――――――――――――――――――――――――――――――――――――――
+    - fn           (Path) Existing xlsx file
+    - engine_name  (SQLAlchemy engine)
+    - schema_name  (str)  Schema name
+    - table_name   (str)  Table name
+
+    - sn           (str)  Sheet name (default first sheet)
+    - chunk        (int)  Rows per chunk (default 50000)
+    - header_rows  (int)  See xlsx_chunks
+    - ifexist      (str)  fail | replace | append for the first chunk (default fail)
+    - queue_size   (int)  Chunks waiting between stages (default 2)
+    - clean        (func) Chunk cleaning function (default clean_chunk, None = off)
+    - writer       (func) Own writer function(df, first) instead of to_sql
+
+    🎯 RETURNS
+    ――――――――――――――――――――――――――――――――――――――――――――――――――
+    → dict with rows, busy and waiting seconds and rows/s for every stage
+    """
+    import queue
+    import threading
+    from timeit import default_timer as timer
+
+    sn = kwargs.get('sn', '')
+    chunk = kwargs.get('chunk', 50000)
+    ifexist = kwargs.get('ifexist', 'fail')
+    qsize = kwargs.get('queue_size', 2)
+    clean = kwargs.get('clean', clean_chunk)
+    writer = kwargs.get('writer', None)
+
+    def to_sql(df, first):
+        chunk_size = 999//(df.shape[1]+1)
+        df.to_sql(name=table_name, con=engine_name, schema=schema_name, index=False,
+                  if_exists=ifexist if first else 'append', chunksize=chunk_size, method='multi')
+
+    writer = writer or to_sql
+
+    stop = threading.Event()
+    errors = []
+    done = object()
+    metrics = {s: {'rows': 0, 'chunks': 0, 'busy': 0.0, 'wait': 0.0} for s in ('read', 'clean', 'write')}
+
+    def put(q, item, m):
+        t = timer()
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                break
+            except queue.Full:
+                pass
+        m['wait'] += timer() - t
+
+    def get(q, m):
+        t = timer()
+        while not stop.is_set():
+            try:
+                item = q.get(timeout=0.1)
+                m['wait'] += timer() - t
+                return item
+            except queue.Empty:
+                pass
+        return done
+
+    def stage(name, source, target, work):
+        m = metrics[name]
+        try:
+            while not stop.is_set():
+                t, w = timer(), m['wait']
+                item = work(source)
+                m['busy'] += timer() - t - (m['wait'] - w)
+                if item is done:
+                    break
+                m['rows'] += len(item)
+                m['chunks'] += 1
+                if target is not None:
+                    put(target, item, m)
+        except Exception as ex:
+            errors.append((name, ex))
+            stop.set()
+        finally:
+            if target is not None:
+                put(target, done, m)
+
+    q_read = queue.Queue(maxsize=qsize)
+    q_clean = queue.Queue(maxsize=qsize)
+    chunks = xlsx_chunks(fn, sn, chunk, header_rows=kwargs.get('header_rows', 1),
+                         delimiter=kwargs.get('delimiter', '-'))
+
+    def read(_):
+        return next(chunks, done)
+
+    def clean_work(q):
+        item = get(q, metrics['clean'])
+        if item is done:
+            return done
+        return clean(item) if clean else item
+
+    first = [True]
+
+    def write(q):
+        item = get(q, metrics['write'])
+        if item is done:
+            return done
+        writer(item, first[0])
+        first[0] = False
+        return item
+
+    log.info(f'Streaming {fn} → {table_name} in chunks of {chunk} rows...')
+    start = timer()
+
+    threads = [threading.Thread(target=stage, args=('read', None, q_read, read), daemon=True),
+               threading.Thread(target=stage, args=('clean', q_read, q_clean, clean_work), daemon=True)]
+    for t in threads:
+        t.start()
+    stage('write', q_clean, None, write)
+    stop.set()
+    for t in threads:
+        t.join()
+
+    elapsed = timer() - start
+    for name, m in metrics.items():
+        m['busy'] = round(m['busy'], 3)
+        m['wait'] = round(m['wait'], 3)
+        m['rows/s'] = round(m['rows'] / m['busy']) if m['busy'] > 0 else 0
+        log.info(f"  {name:<6} | {m['rows']} rows in {m['chunks']} chunks | busy {m['busy']} s | "
+                 f"waiting {m['wait']} s | {m['rows/s']} rows/s")
+    metrics['seconds'] = round(elapsed, 3)
+
+    if errors:
+        name, ex = errors[0]
+        log.error(f'❌ Pipeline FAILED in {name} stage: {ex}')
+        raise ex
+
+    log.info(f"✅ {metrics['write']['rows']} rows written in {round(elapsed, 2)} s")
+    return metrics
+
+
+# Columnar storage
+def df_2_mmap(df, dest, **kwargs):
+    """
+    ====================================================
+
+    🏷 Saves DataFrame as column files which can be memory mapped
+
+    npy format writes one .npy file per column and schema.json into
+    destination folder. Text (object) columns are stored as int32 codes
+    (.npy) and a small pickle with unique values.
+    feather format writes one uncompressed Arrow IPC file (needs pyarrow).
+
+    📌 ARGUMENTS:
+    ――――――――――――――――――――――――――――――――――――――――――――――――――
+    - df   (DataFrame)
+    - dest (Path)       Folder (npy) or file (feather)
+    - fmt  (str)        npy (default) | feather
+
+    🎯 RETURNS
+    ――――――――――――――――――――――――――――――――――――――――――――――――――
+    → Column files, read them back with mmap_2_df
+    """
+
+    import json
+    import pickle
+
+    fmt = kwargs.get('fmt', 'npy')
+    dest = Path(dest)
+
+    if fmt == 'feather':
+        import pyarrow.feather as feather
+
+        feather.write_feather(df, dest, compression='uncompressed')
+        return
+
+    if fmt != 'npy':
+        raise ValueError(f'Unknown format: {fmt}')
+
+    dest.mkdir(parents=True, exist_ok=True)
+
+    def save(col, name, file_name):
+        entry = {'name': name, 'file': file_name + '.npy', 'dtype': str(col.dtype)}
+        path = dest / entry['file']
+
+        if isinstance(col.dtype, pd.CategoricalDtype):
+            entry['kind'] = 'category'
+            np.save(path, np.asarray(col.cat.codes))
+            cats = col.cat.categories
+            with open(path.with_suffix('.pickle'), 'wb') as f:
+                pickle.dump((cats, col.cat.ordered), f, protocol=pickle.HIGHEST_PROTOCOL)
+
+        elif isinstance(col.dtype, pd.DatetimeTZDtype):
+            entry['kind'] = 'datetimetz'
+            entry['tz'] = str(col.dt.tz)
+            entry['unit'] = col.dtype.unit
+            np.save(path, col.dt.tz_convert('UTC').dt.tz_localize(None).to_numpy())
+
+        elif isinstance(col.dtype, np.dtype) and col.dtype.kind in 'biufcmM':
+            entry['kind'] = 'numpy'
+            np.save(path, col.to_numpy())
+
+        else:
+            # Text, mixed objects and pandas extension types
+            entry['kind'] = 'codes'
+            codes, uniques = pd.factorize(col)
+            np.save(path, codes.astype(np.int32))
+            with open(path.with_suffix('.pickle'), 'wb') as f:
+                pickle.dump(uniques, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+        return entry
+
+    schema = {'format': 'df_utils-npy', 'version': 1, 'rows': len(df), 'columns': [], 'index': None}
+
+    for c in range(df.shape[1]):
+        entry = save(df.iloc[:, c], df.columns[c], f'{c:05d}')
+        entry['name'] = entry['name'] if isinstance(entry['name'], (str, int, float)) else str(entry['name'])
+        schema['columns'].append(entry)
+
+    if not isinstance(df.index, pd.RangeIndex) or df.index.start != 0 or df.index.step != 1:
+        schema['index'] = save(df.index.to_series(), df.index.name, 'index')
+
+    with open(dest / 'schema.json', 'w', encoding='utf-8') as f:
+        json.dump(schema, f, ensure_ascii=False, indent=1)
+
+    log.info(f'Created: {dest} ({len(schema["columns"])} columns)')
+
+
+def mmap_2_df(src, columns=None, **kwargs):
+    """
+    ====================================================
+
+    🏷 Opens DataFrame saved with df_2_mmap
+
+    Numeric, boolean and datetime columns are memory mapped, so opening
+    is instant and only touched data is read from disk. Text columns
+    are built from codes when they are loaded.
+
+    📌 ARGUMENTS:
+    ――――――――――――――――――――――――――――――――――――――――――――――――――
+    - src     (Path)       Folder (npy) or file (feather)
+    - columns (list[str])  Load only these columns (default all)
+    - mmap    (bool)       Memory map column files (default True)
+
+    🎯 RETURNS
+    ――――――――――――――――――――――――――――――――――――――――――――――――――
+    → DataFrame
+    """
+
+    import json
+    import pickle
+
+    src = Path(src)
+    mode = 'c' if kwargs.get('mmap', True) else None
+
+    if src.is_file():
+        import pyarrow.feather as feather
+
+        table = feather.read_table(src, columns=columns, memory_map=mode is not None)
+        return table.to_pandas()
+
+    with open(src / 'schema.json', encoding='utf-8') as f:
+        schema = json.load(f)
+
+    def load(entry):
+        path = src / entry['file']
+        kind = entry['kind']
+
+        if kind == 'numpy':
+            return np.load(path, mmap_mode=mode)
+
+        if kind == 'datetimetz':
+            values = np.load(path, mmap_mode=mode)
+            return pd.DatetimeIndex(values).tz_localize('UTC').tz_convert(entry['tz'])
+
+        with open(path.with_suffix('.pickle'), 'rb') as f:
+            extra = pickle.load(f)
+        codes = np.load(path, mmap_mode=mode)
+
+        if kind == 'category':
+            cats, ordered = extra
+            return pd.Categorical.from_codes(codes, categories=cats, ordered=ordered)
+
+        return pd.api.extensions.take(extra.array if hasattr(extra, 'array') else extra, np.asarray(codes), allow_fill=True)
+
+    entries = schema['columns']
+    if columns is not None:
+        wanted = list(columns)
+        names = [e['name'] for e in entries]
+        missing = [c for c in wanted if c not in names]
+        if missing:
+            raise KeyError(f'Columns not found: {missing}')
+        # Duplicate column names give all columns with that name, as df[[name]]
+        entries = [e for c in wanted for e in entries if e['name'] == c]
+
+    index = None
+    if schema['index'] is not None:
+        index = pd.Index(load(schema['index']), name=schema['index']['name'])
+
+    # Built by position, so duplicate column names are kept
+    data = {i: load(e) for i, e in enumerate(entries)}
+    res = pd.DataFrame(data, index=index, copy=False)
+    res.columns = [e['name'] for e in entries]
+    if not len(entries):
+        res = pd.DataFrame(index=index if index is not None else pd.RangeIndex(schema['rows']))
+
+    return res
+
+
 def from_excel_ordinal(ordinal, _epoch0=datetime(1899, 12, 31)):
     # Convert Excel date shown as serial number into a date string
     if ordinal >= 60:
@@ -279,6 +1327,88 @@ def from_excel_ordinal(ordinal, _epoch0=datetime(1899, 12, 31)):
     return (_epoch0 + timedelta(days=ordinal)).replace(microsecond=0)
 
 
+def df_normalize(df, **kwargs):
+    """
+    ==================================================
+
+    🏷 Converts Python objects in DataFrame to native dtypes
+
+    Prepares DataFrame for export (df_2_xlsx, df_2_xlsx_append), so
+    the writers get numbers and datetime64 columns instead of objects:
+    - object columns with Decimals/numbers → float64 (or int64)
+    - object columns with datetime objects → datetime64
+    - object columns with date objects → datetime64 (dates=1, default)
+      or kept as dates (dates=0, the writers then use a date-only format)
+    - timezone info is removed (local time is kept, Excel has no time zones;
+      objects with mixed time zones are converted to UTC first)
+
+    📌 ARGUMENTS:
+    ――――――――――――――――――――――――――――――――――――――――――――――――――
+    - df  (DataFrame)
+    - tz    (str) Convert aware datetimes to this time zone before
+                  removing time zone info (optional, e.g. 'Europe/Zagreb')
+    - dates (int) 1 = date objects → datetime64 (default), 0 = keep them
+
+    🎯 RETURNS
+    ――――――――――――――――――――――――――――――――――――――――――――――――――
+    → New DataFrame (columns which are not changed are not copied)
+    """
+
+    tz = kwargs.get('tz', None)
+    dates = kwargs.get('dates', 1)
+    changes = {}
+
+    for c in range(df.shape[1]):
+        col = df.iloc[:, c]
+
+        if isinstance(col.dtype, pd.DatetimeTZDtype):
+            changes[c] = (col.dt.tz_convert(tz) if tz else col).dt.tz_localize(None)
+            continue
+
+        if col.dtype != object:
+            continue
+
+        kind = pd.api.types.infer_dtype(col, skipna=True)
+
+        if kind in ('decimal', 'floating', 'integer', 'mixed-integer-float'):
+            changes[c] = pd.to_numeric(col, errors='coerce')
+            if kind == 'decimal':
+                changes[c] = changes[c].astype('float64')
+
+        elif kind in ('datetime', 'datetime64') or (kind == 'date' and dates):
+            try:
+                res = pd.to_datetime(col)
+            except (ValueError, TypeError):
+                # Mixed time zones
+                res = pd.to_datetime(col, utc=True)
+            if isinstance(res.dtype, pd.DatetimeTZDtype):
+                res = (res.dt.tz_convert(tz) if tz else res).dt.tz_localize(None)
+            changes[c] = res
+
+    if not changes:
+        return df
+
+    res = df.copy(deep=False)
+    for c, col in changes.items():
+        res.isetitem(c, col)
+
+    return res
+
+
+def xlsx_col_widths(df, index=True):
+    """
+    🏷 Column widths (max text length) for Excel, computed per column, not per cell
+    """
+
+    def width(values, name):
+        values = pd.Series(values)
+        n = values.astype(str).str.len().max() if len(values) else 0
+        return int(max(n if n == n else 0, len(str(name))))
+
+    res = [width(df.index, df.index.name)] if index else []
+    return res + [width(df.iloc[:, c], df.columns[c]) for c in range(df.shape[1])]
+
+
 def df_2_xlsx_append(df, fn, sn, **kwargs):
     """
     =================================================
@@ -296,6 +1426,8 @@ def df_2_xlsx_append(df, fn, sn, **kwargs):
     fn  (Path)      Existing xlsx file
     sn  (str)       Sheet Name for a new data
 
+    normalize (int) 1 = convert objects to native dtypes first (default), see df_normalize
+
     🎯 RETURNS
     ―――――――――――――――――――――――――――――――――――――――――――――――――
     → File list
@@ -312,6 +1444,7 @@ def df_2_xlsx_append(df, fn, sn, **kwargs):
 
     nrows = 2
     ton = 0
+    norm = 1
     t = []
     if 'list' in str(type(df)):
         t = [np.nan]*len(df)
@@ -323,8 +1456,16 @@ def df_2_xlsx_append(df, fn, sn, **kwargs):
             t = v
         if k == 'titles':
             ton = v
+        if k == 'normalize':
+            norm = v
 
-    print(f'\nAppending data into file: {fn} | worksheet: {sn}\n')
+    if norm:
+        if 'list' in str(type(df)):
+            df = [df_normalize(d, dates=0) for d in df]
+        else:
+            df = df_normalize(df, dates=0)
+
+    log.info(f'Appending data into file: {fn} | worksheet: {sn}')
     from openpyxl import load_workbook
     from openpyxl.utils.dataframe import dataframe_to_rows
     from openpyxl.styles import Font,PatternFill
@@ -347,26 +1488,26 @@ def df_2_xlsx_append(df, fn, sn, **kwargs):
                 for r in dataframe_to_rows(d, index=False, header=True):
                     ws.append(r)
 
-                    for y in range(1, d.shape[1]+1):
-                        ws.cell(row=rc, column=y).font = fg_style
-                        ws.cell(row=rc, column=y).fill = bg_style
+                for y in range(1, d.shape[1]+1):
+                    ws.cell(row=rc, column=y).font = fg_style
+                    ws.cell(row=rc, column=y).fill = bg_style
 
                 ws.append([np.nan])
                 rc += d.shape[0]+nrows
         else:
-            print('ERROR - DataFrame & Titles mismatch')
+            log.error('DataFrame & Titles mismatch')
     else:
         for r in dataframe_to_rows(df, index=False, header=True):
             ws.append(r)
 
-            for y in range(1, df.shape[1]+1):
-                ws.cell(row=1, column=y).font = fg_style
-                ws.cell(row=1, column=y).fill = bg_style
+        for y in range(1, df.shape[1]+1):
+            ws.cell(row=1, column=y).font = fg_style
+            ws.cell(row=1, column=y).fill = bg_style
     try:
         wb.save(fn)
-        print('✅ Successfully append\n')
-    except:
-        print('ERROR appending\n')
+        log.info(f'✅ Successfully appended: {fn}')
+    except Exception as ex:
+        log.error(f'ERROR appending: {ex}')
 
 def df_2_xlsx(df, fn, sn, **kwargs):
     """
@@ -388,6 +1529,11 @@ def df_2_xlsx(df, fn, sn, **kwargs):
     - properties   (dict)       custom file properties
     - index_on     (boolean)    Print with index True or False
 
+    - normalize    (int)        1 = convert objects to native dtypes first (default), see df_normalize
+    - num_formats  (dict)       Excel number format per column {column: '#,##0.00'}
+    - float_format (str)        Excel number format for all float columns
+    - date_format  (str)        Excel format for datetime columns (default 'yyyy-mm-dd hh:mm:ss')
+
     🎯 RETURNS:
     ―――――――――――――――――――――――――――――――――――――――――――――――――――――――――――――――――――
     → Single xlsx file with worksheet(s)
@@ -404,6 +1550,10 @@ def df_2_xlsx(df, fn, sn, **kwargs):
     ss  = 0
     ind = False
     ts  = 'Table Style Medium 2'
+    norm = 1
+    nf  = {}
+    ff  = None
+    dtf = 'yyyy-mm-dd hh:mm:ss'
     wsp = {
             'author':   'IgorP',
             'company':  'Private',
@@ -426,14 +1576,24 @@ def df_2_xlsx(df, fn, sn, **kwargs):
             wsp = v
         if k == 'index_on':
             ind = v
+        if k == 'normalize':
+            norm = v
+        if k == 'num_formats':
+            nf = v
+        if k == 'float_format':
+            ff = v
+        if k == 'date_format':
+            dtf = v
 
     import xlsxwriter
 
-    def get_col_widths(dataframe):
-        idx_max = max([len(str(s)) for s in dataframe.index.values] + [len(str(dataframe.index.name))])
-        return [idx_max] + [max([len(str(s)) for s in dataframe[col].values] + [len(col)]) for col in dataframe.columns]
+    if norm:
+        if 'list' in str(type(df)):
+            df = [df_normalize(d, dates=0) for d in df]
+        elif 'DataFrame' in str(type(df)):
+            df = df_normalize(df, dates=0)
 
-    writer = pd.ExcelWriter(fn, engine='xlsxwriter')
+    writer = pd.ExcelWriter(fn, engine='xlsxwriter', datetime_format=dtf)
 
     # Declare Excel Workbook
     workbook  = writer.book
@@ -450,6 +1610,28 @@ def df_2_xlsx(df, fn, sn, **kwargs):
         'border'     : 1
         }
 
+    num_formats = {}
+
+    def set_columns(ws, d):
+        # Width and number format are set once per column, not per cell
+        widths = xlsx_col_widths(d, index=False) if ac else [None] * d.shape[1]
+        off = d.index.nlevels if ind else 0
+
+        if ac and ind:
+            for i, width in enumerate(xlsx_col_widths(d.index.to_frame(index=False), index=False)):
+                ws.set_column(i, i, width+2)
+
+        for i in range(d.shape[1]):
+            fmt = nf.get(d.columns[i])
+            if fmt is None and ff and d.dtypes.iloc[i].kind == 'f':
+                fmt = ff
+            if fmt is not None and fmt not in num_formats:
+                num_formats[fmt] = workbook.add_format({'num_format': fmt})
+
+            if widths[i] is not None or fmt is not None:
+                width = widths[i]+2 if widths[i] is not None else None
+                ws.set_column(i+off, i+off, width, num_formats.get(fmt))
+
 
     # Check if list of DataFrames is passed in argument
     if 'list' in str(type(df)):
@@ -463,8 +1645,7 @@ def df_2_xlsx(df, fn, sn, **kwargs):
                     d.to_excel(writer, sheet_name=s, index=ind)
 
                     ws = writer.sheets[s]
-                    for i, width in enumerate(get_col_widths(d)):
-                        ws.set_column(i-1, i-1, width+2)
+                    set_columns(ws, d)
 
                     if ss:
                         # Table style format
@@ -491,8 +1672,7 @@ def df_2_xlsx(df, fn, sn, **kwargs):
                 ws.set_zoom(80)
 
         else:
-            print('List of DataFrames and WorkSheets are not of the same size.')
-            print('Exiting...')
+            log.error('List of DataFrames and WorkSheets are not of the same size. Exiting...')
             exit()
     # If not, check if the single DataFrame is actually a DataFrame type
     else:
@@ -505,9 +1685,7 @@ def df_2_xlsx(df, fn, sn, **kwargs):
             #-----------------------------------------------
             ws = writer.sheets[sn]
 
-            if ac:
-                for i, width in enumerate(get_col_widths(df)):
-                    ws.set_column(i-1, i-1, width+2)
+            set_columns(ws, df)
 
             # Style Sheet for Table
             #------------------------------------
@@ -536,15 +1714,14 @@ def df_2_xlsx(df, fn, sn, **kwargs):
             ws.set_zoom(80)
 
         else:
-            print('This is not a single dataframe for process.')
-            print('Exiting...')
+            log.error('This is not a single dataframe for process. Exiting...')
             exit()
 
     try:
         writer._save()
-        print('\n✅ Successfully saved: ',fn)
+        log.info(f'✅ Successfully saved: {fn}')
     except xlsxwriter.exceptions.FileCreateError:
-        print('\n\nERROR!!!\nCannot write in opened file.\nCLOSE THE FILE, PLEASE!\n')
+        log.error(f'Cannot write in opened file {fn}. CLOSE THE FILE, PLEASE!')
 
 
 def print_df(df, **kwargs):
@@ -773,7 +1950,7 @@ def clean_df(df, fillna=''):
     """
     # Remove empty rows and columns
     res =  df.dropna(how='all', axis=0, inplace=False)
-    res = res.dropna(how='all', axis=1, inplace=True)
+    res = res.dropna(how='all', axis=1)
 
     # Strip leading and trailing spaces in column names
     res.columns = res.columns.str.strip()
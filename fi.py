@@ -5,13 +5,23 @@
 👔 by Igor Perković
 
 🛠 CREATED: 2020-10-13 08:39:29
-📆 CHANGED: 2022-09-07 11:05:42
+📆 CHANGED: 2026-10-20 11:44:21
 
 ---
 ⚙ PREREQUISITES:
 📘 Libraries: pandas, rapidfuzz
 
 """
+import logging
+from collections import namedtuple
+
+try:
+    from . import tm
+except ImportError:
+    import tm
+
+log = logging.getLogger(__name__)
+
 
 # List functions
 #--------------------------------------------------
@@ -21,6 +31,9 @@ def transpose_list(list_in, na=None):
 
     🏷 Transposing a list of list
 
+    Shorter sublists are padded with `na` to the length of the longest one.
+    Input list is not changed.
+
     📌 ARGUMENTS:
     ―――――――――――――――――――――――――――――
     - list_in  list
@@ -31,16 +44,10 @@ def transpose_list(list_in, na=None):
     → Transposed list
     """
 
-    # First I need to find maximum length of all sublists
-    max_len = max(len(s) for s in list_in)
+    from itertools import zip_longest
 
-    # then, in every other sublist with less than max items, append empty symbol
-    for i in list_in:
-        if len(i) < max_len:
-            i.append(na)
-
-    # Finally, prepare the result as a transposed list of lists
-    res = [list(i) for i in zip(*list_in)]
+    # Transposed list of lists, short sublists padded with na
+    res = [list(i) for i in zip_longest(*list_in, fillvalue=na)]
 
     return res
 
@@ -51,28 +58,133 @@ def rotate_list(l,n):
 
     🏷 Rotate a list
 
+    Lists are rotated with two slices, NumPy arrays with np.roll
+    and deques in place with deque.rotate.
+    For repeated rotations use RingList, where rotation is O(1).
+
     📌 ARGUMENTS:
     ―――――――――――――――――――――――――――――
     - l  list
-    - n  number of positions for rotating to the righ
+    - n  number of positions for rotating to the left (item n becomes first)
 
     🎯 RETURNS
     ―――――――――――――――――――――――――――――
     → Rotated list
     """
 
-    return [l[(i + n) % len(l)] for i, x in enumerate(l)]
+    from collections import deque
+
+    if isinstance(l, deque):
+        l.rotate(-n)
+        return l
+
+    if type(l).__module__ == 'numpy':
+        import numpy as np
+        return np.roll(l, -n)
+
+    if not len(l):
+        return list(l)
+
+    k = n % len(l)
+    return list(l[k:]) + list(l[:k])
+
+
+class RingList:
+    """
+    =============================
+
+    🏷 List with O(1) rotation (ring buffer)
+
+    Rotation only moves the start position, items are not copied.
+    With maxlen it works as a sliding window: append drops the oldest item.
+
+    📌 ARGUMENTS:
+    ―――――――――――――――――――――――――――――
+    - items   (list) Initial items
+    - maxlen  (int)  Maximum number of items (optional)
+
+    # EXAMPLE:
+    r = RingList([1, 2, 3])
+    r.rotate(1)     # [2, 3, 1]
+    r.tolist()
+    """
+
+    def __init__(self, items=(), maxlen=None):
+        self._items = list(items)
+        self._start = 0
+        self.maxlen = maxlen
+        if maxlen is not None and len(self._items) > maxlen:
+            self._items = self._items[len(self._items) - maxlen:]
+
+    def __len__(self):
+        return len(self._items)
+
+    def __getitem__(self, i):
+        n = len(self._items)
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(n))]
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError('RingList index out of range')
+        return self._items[(self._start + i) % n]
+
+    def __setitem__(self, i, value):
+        n = len(self._items)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError('RingList index out of range')
+        self._items[(self._start + i) % n] = value
+
+    def __iter__(self):
+        s = self._start
+        yield from self._items[s:]
+        yield from self._items[:s]
+
+    def __repr__(self):
+        return f'RingList({self.tolist()})'
+
+    def rotate(self, n):
+        """Rotates to the left by n positions (same as rotate_list) in O(1)."""
+        if self._items:
+            self._start = (self._start + n) % len(self._items)
+
+    def append(self, x):
+        """Appends item at the end, with maxlen the oldest item is replaced."""
+        if self.maxlen is not None and len(self._items) >= self.maxlen:
+            if self.maxlen == 0:
+                return
+            self._items[self._start] = x
+            self._start = (self._start + 1) % len(self._items)
+        else:
+            # New item goes just before the current start
+            if self._start:
+                self._items.insert(self._start, x)
+                self._start += 1
+            else:
+                self._items.append(x)
+
+    def tolist(self):
+        """Items in current order as a new list."""
+        s = self._start
+        return self._items[s:] + self._items[:s]
 
 
-def flatten_list(in_list):
+def flatten_list(in_list, types=None):
     """
     =============================
 
     🏷 Flatten any embedded list
 
+    Uses its own stack instead of recursion, so any depth of nesting works.
+    Lists, tuples, sets, ranges, generators/iterators and NumPy arrays are
+    flattened. Strings, bytes and dicts are kept as single items.
+
     📌 ARGUMENTS:
     ―――――――――――――――――――――――――――――
     - in_list    list for flattening
+    - types      (tuple) only these types are flattened (optional)
 
     🎯 RETURNS
     ―――――――――――――――――――――――――――――
@@ -87,14 +199,53 @@ def flatten_list(in_list):
     res_list = list(flatten(some_list))
     """
 
-    for x in in_list:
-        if isinstance(x, list) and not isinstance(x, (str, bytes)):
-            yield from flatten_list(x)
-        else:
+    from collections.abc import Iterator
+
+    arrays = types is None
+    if types is None:
+        types = (list, tuple, set, frozenset, range, Iterator)
+
+    def nested(x):
+        if isinstance(x, types):
+            return iter(x)
+        # NumPy arrays without importing NumPy
+        if arrays and type(x).__module__ == 'numpy' and getattr(x, 'ndim', 0) > 0:
+            return iter(x.ravel().tolist())
+        return None
+
+    stack = [iter(in_list)]
+    while stack:
+        for x in stack[-1]:
+            it = None if isinstance(x, (str, bytes, bytearray, dict)) else nested(x)
+            if it is not None:
+                stack.append(it)
+                break
             yield x
+        else:
+            stack.pop()
+
 
+def _is_array(x):
+    # NumPy array or pandas Series/Index, without importing them
+    return type(x).__module__.split('.')[0] in ('numpy', 'pandas') and hasattr(x, 'shape')
 
-def remove_sublist(ml, ul) -> list:
+
+def _isin(values, test):
+    # Vectorized membership test for NumPy/pandas inputs
+    import numpy as np
+    import pandas as pd
+
+    if not _is_array(test):
+        test = list(test)
+    if isinstance(values, (pd.Series, pd.Index)):
+        return np.asarray(values.isin(test))
+    if not _is_array(values):
+        # np.asarray would turn a mixed list [1, 'a'] into strings
+        return np.asarray(pd.Series(list(values), dtype=object).isin(test))
+    return np.asarray(pd.Series(np.asarray(values).ravel()).isin(test))
+
+
+def remove_sublist(ml, ul, multiset=0) -> list:
     """
     ==================================================
 
@@ -104,16 +255,57 @@ def remove_sublist(ml, ul) -> list:
     ―――――――――――――――――――――――――――――――――――――――――――――――――――
     - ml (list)  main_list from which I want to remove..
     - ul (list)  unwanted list istems
+    - multiset (int) 0 = remove every occurrence of unwanted items
+                     1 = remove each unwanted item only as many times
+                         as it is in unwanted list
+
+    With multiset=0 NumPy arrays and pandas Series are filtered with isin and returned
+    as the same type (multi-dimensional arrays as flat 1-D array of remaining items).
+    Unhashable items fall back to slow list search.
 
     🎯 RETURNS
     ―――――――――――――――――――――――――――――――――――――――――――――――――――
     → Reduced main list
     """
 
-    return [x for x in ml if x not in ul]
+    if _is_array(ml) and not multiset:
+        if ml.ndim > 1:
+            import numpy as np
+            ml = np.asarray(ml).ravel()
+        return ml[~_isin(ml, ul)]
 
-
-def check_sublist(main_list, sub_list, exception=0) -> bool:
+    try:
+        if multiset:
+            from collections import Counter
+
+            left = Counter(ul)
+            res = []
+            for x in ml:
+                if left[x] > 0:
+                    left[x] -= 1
+                else:
+                    res.append(x)
+            return res
+
+        us = set(ul)
+        return [x for x in ml if x not in us]
+
+    except TypeError:
+        # Unhashable items (lists, dicts, ...)
+        if multiset:
+            left = list(ul)
+            res = []
+            for x in ml:
+                if x in left:
+                    left.remove(x)
+                else:
+                    res.append(x)
+            return res
+
+        return [x for x in ml if x not in ul]
+
+
+def check_sublist(main_list, sub_list, exception=0, multiset=0) -> bool:
     """
     =============================
 
@@ -124,19 +316,41 @@ def check_sublist(main_list, sub_list, exception=0) -> bool:
     - main_list    list in which I try to find..
     - sub_list     ..this sub-list
     - exception=0  with exception of n items. # Default is 0 which means all items of sub-list should be in main list to get True as a result.
+    - multiset=0   1 = every repeated item of sub-list needs its own occurrence in main list
+
+    Items of sub-list are counted, so duplicates in main list do not change the result.
 
     🎯 RETURNS
     ―――――――――――――――――――――――――――――
     → True or False
     """
 
-    sl = set(sub_list)
-    res = [x for x in main_list if x in sl]
+    if multiset:
+        try:
+            from collections import Counter
+
+            missing = sum((Counter(sub_list) - Counter(main_list)).values())
+        except TypeError:
+            left = list(main_list)
+            missing = 0
+            for x in sub_list:
+                if x in left:
+                    left.remove(x)
+                else:
+                    missing += 1
+
+    elif _is_array(sub_list) or _is_array(main_list):
+        found = _isin(sub_list, main_list)
+        missing = len(found) - int(found.sum())
 
-    if (len(res) == (len(sub_list) - exception)):
-        return True
     else:
-        return False
+        try:
+            ms = set(main_list)
+        except TypeError:
+            ms = list(main_list)
+        missing = sum(1 for x in sub_list if x not in ms)
+
+    return missing == exception
 
 
 def list_2_pickle(src_list, fn):
@@ -157,14 +371,13 @@ def list_2_pickle(src_list, fn):
 
     import pickle
 
-    print(f'Storing list into: 💾 {fn}')
+    log.debug(f'Storing list into: 💾 {fn}')
     try:
-        f = open(fn,'wb')
-        pickle.dump(src_list,f)
-        f.close()
-        print('\n ✔Successfully saved: 💾',fn)
-    except:
-        print(f'❌ ERROR saving list into {fn} file.')
+        with open(fn,'wb') as f:
+            pickle.dump(src_list, f, protocol=pickle.HIGHEST_PROTOCOL)
+        log.info(f'✔ Successfully saved: 💾 {fn}')
+    except Exception as ex:
+        log.error(f'❌ ERROR saving list into {fn} file: {ex}')
 
 
 def pickle_2_list(fn) -> list:
@@ -173,6 +386,9 @@ def pickle_2_list(fn) -> list:
 
     🏷 Read serialized list from pickle to list
 
+    If the file holds more pickled objects (written one after another),
+    all of them are read: lists are joined, other objects are appended.
+
     📌 ARGUMENTS:
     ――――――――――――――――――――――――――――――――――――――――――――
     - fn (Path) file name
@@ -185,18 +401,285 @@ def pickle_2_list(fn) -> list:
 
     import pickle
 
-    res = []
+    objects = []
     with (open(fn, 'rb')) as pickle_file:
         while True:
             try:
-                res = pickle.load(pickle_file)
+                objects.append(pickle.load(pickle_file))
             except EOFError:
                 break
-    print(f'✔ Successfully read {fn} file.')
+    log.info(f'✔ Successfully read {fn} file.')
+
+    if len(objects) == 1:
+        return objects[0]
 
+    res = []
+    for o in objects:
+        if isinstance(o, list):
+            res.extend(o)
+        else:
+            res.append(o)
     return res
 
 
+# Record store
+#--------------------------------------------------
+# File of pickled records (batches) which can be appended without rewriting.
+# Every record:  magic | codec | number of buffers | lengths of all parts | parts
+# Parts are pickle stream (protocol 5) and its out-of-band buffers (NumPy, pandas data).
+# Offsets of records are kept in a sidecar file <fn>.idx for random access.
+
+_RECORD_HEAD = '<4sBI'
+_RECORD_MAGIC = b'DFR1'
+_RECORD_CODECS = {'': 0, 'gzip': 1, 'lz4': 2, 'zstd': 3}
+
+
+def _record_codec(name):
+    # Returns (codec id, compress function, decompress function)
+    import importlib.util
+
+    if name == 'auto':
+        if importlib.util.find_spec('lz4'):
+            name = 'lz4'
+        elif importlib.util.find_spec('zstandard'):
+            name = 'zstd'
+        else:
+            name = 'gzip'
+
+    if isinstance(name, int):
+        name = {v: k for k, v in _RECORD_CODECS.items()}[name]
+
+    if name == '':
+        return 0, None, None
+    if name == 'gzip':
+        import gzip
+        return 1, lambda b: gzip.compress(b, compresslevel=6, mtime=0), gzip.decompress
+    if name == 'lz4':
+        import lz4.frame
+        return 2, lz4.frame.compress, lz4.frame.decompress
+    if name == 'zstd':
+        import zstandard
+        return 3, zstandard.ZstdCompressor().compress, lambda b: zstandard.ZstdDecompressor().decompress(b)
+
+    raise ValueError(f'Unknown compression: {name}')
+
+
+def _record_header(f):
+    # Reads record header at current position, returns (codec, part lengths, header size) or None at the end.
+    # Torn record at the end (interrupted append) is the end of the store too.
+    import os
+    import struct
+
+    left = os.fstat(f.fileno()).st_size - f.tell()
+    size = struct.calcsize(_RECORD_HEAD)
+    if left < size:
+        return None
+
+    magic, codec, nb = struct.unpack(_RECORD_HEAD, f.read(size))
+    if magic != _RECORD_MAGIC:
+        raise ValueError(f'Not a record store or damaged file: {f.name}')
+
+    head_size = size + 8 * (nb + 1)
+    if head_size > left:
+        return None
+
+    lengths = struct.unpack(f'<{nb + 1}Q', f.read(8 * (nb + 1)))
+    if head_size + sum(lengths) > left:
+        return None
+    return codec, lengths, head_size
+
+
+def pickle_index(fn) -> list:
+    """
+    ====================================================
+
+    🏷 Offsets of all records in a record store file
+
+    Sidecar index <fn>.idx is used when it matches the file,
+    otherwise records are scanned (headers only) and index is rewritten.
+
+    📌 ARGUMENTS:
+    ――――――――――――――――――――――――――――――――――――――――――――
+    - fn (Path) Record store file
+
+    🎯 RETURNS
+    ――――――――――――――――――――――――――――――――――――――――――――
+    → list of offsets
+    """
+
+    import os
+    from array import array
+
+    fn = str(fn)
+    if not os.path.exists(fn):
+        return []
+
+    end = os.path.getsize(fn)
+    offsets = array('Q')
+
+    with open(fn, 'rb') as f:
+        if os.path.exists(fn + '.idx'):
+            with open(fn + '.idx', 'rb') as fx:
+                data = fx.read()
+            offsets.frombytes(data[:len(data) // 8 * 8])
+            if len(offsets) == 0 and end == 0:
+                return []
+            if len(offsets):
+                f.seek(offsets[-1])
+                h = _record_header(f)
+                if h and offsets[-1] + h[2] + sum(h[1]) == end:
+                    return offsets.tolist()
+
+        # Rebuild index
+        offsets = array('Q')
+        pos = 0
+        f.seek(0)
+        while pos < end:
+            h = _record_header(f)
+            if h is None:
+                break
+            offsets.append(pos)
+            pos += h[2] + sum(h[1])
+            f.seek(pos)
+
+    with open(fn + '.idx', 'wb') as fx:
+        fx.write(offsets.tobytes())
+
+    return offsets.tolist()
+
+
+def pickle_append(obj, fn, compress=''):
+    """
+    ====================================================
+
+    🏷 Appends one record (e.g. batch of a list) to a record store file
+
+    Uses the highest pickle protocol with out-of-band buffers,
+    so NumPy arrays and DataFrames are written without extra copies.
+
+    📌 ARGUMENTS:
+    ――――――――――――――――――――――――――――――――――――――――――――
+    - obj      (any)  Object to store
+    - fn       (Path) Record store file (created if missing)
+    - compress (str)  '' | 'gzip' | 'lz4' | 'zstd' | 'auto' (lz4, zstd or gzip - what is installed)
+
+    🎯 RETURNS
+    ――――――――――――――――――――――――――――――――――――――――――――
+    → Number of the record in file
+    """
+
+    import os
+    import pickle
+    import struct
+    from array import array
+
+    codec, comp, _ = _record_codec(compress)
+
+    buffers = []
+    payload = pickle.dumps(obj, protocol=5, buffer_callback=buffers.append)
+    parts = [payload] + [b.raw() for b in buffers]
+    if comp:
+        parts = [comp(p) for p in parts]
+
+    head = struct.pack(_RECORD_HEAD, _RECORD_MAGIC, codec, len(buffers))
+    head += struct.pack(f'<{len(parts)}Q', *[memoryview(p).nbytes for p in parts])
+
+    fn = str(fn)
+    offsets = pickle_index(fn)
+    n = len(offsets)
+
+    # End of the last complete record, a torn one from an interrupted append is dropped
+    offset = 0
+    if n:
+        with open(fn, 'rb') as f:
+            f.seek(offsets[-1])
+            h = _record_header(f)
+            offset = offsets[-1] + h[2] + sum(h[1])
+
+    with open(fn, 'r+b' if os.path.exists(fn) else 'wb') as f:
+        f.truncate(offset)
+        f.seek(offset)
+        f.write(head)
+        for p in parts:
+            f.write(p)
+
+    with open(fn + '.idx', 'r+b' if os.path.exists(fn + '.idx') else 'wb') as fx:
+        fx.truncate(8 * n)
+        fx.seek(8 * n)
+        fx.write(array('Q', [offset]).tobytes())
+
+    return n
+
+
+def _record_read(f):
+    # Reads one record from current position
+    import pickle
+
+    h = _record_header(f)
+    if h is None:
+        return None
+    codec, lengths, _ = h
+    _, _, decomp = _record_codec(codec)
+
+    parts = []
+    for n in lengths:
+        p = f.read(n)
+        if decomp:
+            p = decomp(p)
+        parts.append(bytearray(p))
+
+    return pickle.loads(parts[0], buffers=parts[1:])
+
+
+def pickle_records(fn, start=0):
+    """
+    ====================================================
+
+    🏷 Reads records from a record store file lazily
+
+    📌 ARGUMENTS:
+    ――――――――――――――――――――――――――――――――――――――――――――
+    - fn    (Path) Record store file
+    - start (int)  Number of the first record
+
+    🎯 RETURNS
+    ――――――――――――――――――――――――――――――――――――――――――――
+    → Generator of stored objects
+
+    # EXAMPLE:
+    for batch in fi.pickle_records(fn):
+        ...
+    """
+
+    offsets = pickle_index(fn)
+    if start >= len(offsets):
+        return
+
+    with open(fn, 'rb') as f:
+        for offset in offsets[start:]:
+            f.seek(offset)
+            yield _record_read(f)
+
+
+def pickle_record(fn, n):
+    """
+    🏷 Reads record number n from a record store file
+    """
+
+    offsets = pickle_index(fn)
+    with open(fn, 'rb') as f:
+        f.seek(offsets[n])
+        return _record_read(f)
+
+
+def pickle_count(fn) -> int:
+    """
+    🏷 Number of records in a record store file
+    """
+
+    return len(pickle_index(fn))
+
+
 def list_slice (list, chunks):
     """
     =================================================================
@@ -217,7 +700,166 @@ def list_slice (list, chunks):
     return res
 
 
-def replace_many(text, dic):
+def list_chunks(seq, chunks, step=None, mode='view'):
+    """
+    =================================================================
+
+    🏷 Lazy chunk iterator (list_slice without building all chunks)
+
+    NumPy arrays give array views, bytes/bytearray/array.array give
+    memoryview slices, so no data is copied. Other sequences give
+    slices one by one, or index ranges with mode='range'.
+
+    📌 ARGUMENTS:
+    ―――――――――――――――――――――――――――――
+    - seq    (list)  source list, array, bytes, ...
+    - chunks (int)   number of items in a chunk
+    - step   (int)   start of the next chunk, default = chunks.
+                     step < chunks gives overlapping windows
+    - mode   (str)   view  = chunks (default)
+                     range = range(start, end) of every chunk
+
+    🎯 RETURNS
+    ―――――――――――――――――――――――――――――
+    → Generator of chunks
+    """
+
+    from array import array
+
+    step = step or chunks
+    n = len(seq)
+
+    if mode == 'range':
+        view = range(n)
+    elif isinstance(seq, (bytes, bytearray, memoryview, array)):
+        view = memoryview(seq)
+    else:
+        view = seq
+
+    for i in range(0, n, step):
+        yield view[i:i+chunks]
+        if i + chunks >= n:
+            break
+
+
+def _trie_pattern(keys):
+    # Regex from a trie of keys: a(?:b(?:c)?|d) for a, ab, abc, ad.
+    # Greedy optional parts make the longest key win at every position.
+
+    import re
+
+    trie = {}
+    for k in keys:
+        node = trie
+        for ch in k:
+            node = node.setdefault(ch, {})
+        node[''] = True
+
+    def emit(node):
+        end = '' in node
+        alts = []
+        chars = []      # children which end there, joined into [abc]
+        for ch in sorted(c for c in node if c):
+            child = node[ch]
+            if len(child) == 1 and '' in child:
+                chars.append(re.escape(ch))
+            else:
+                alts.append(re.escape(ch) + emit(child))
+        if chars:
+            alts.append(chars[0] if len(chars) == 1 else '[' + ''.join(chars) + ']')
+        if not alts:
+            return ''
+        if len(alts) == 1 and not end:
+            return alts[0]
+        return '(?:' + '|'.join(alts) + ')' + ('?' if end else '')
+
+    return emit(trie)
+
+
+def compile_replacer(dic):
+    """
+    ==================================================================
+
+    🏷 Compiles replacement dictionary into a single-pass replacer
+
+    Keys are built into a trie and the trie is written as one regex
+    (common prefixes are tested only once, so thousands of keys cost
+    about as much as a few). At every position in the text the longest
+    key that fits there is replaced. Text is scanned only once and the
+    result does not depend on the order of keys in the dictionary.
+
+    📌 ARGUMENTS:
+    ―――――――――――――――――――――――――――――
+    - dic  (dictionary) Replace dictionary
+
+    🎯 RETURNS
+    ―――――――――――――――――――――――――――――
+    → Function which takes a text and returns a new text
+    """
+
+    import re
+
+    keys = [k for k in dic if len(k)]
+
+    if not keys:
+        return lambda text: text
+
+    table = {k: dic[k] for k in keys}
+    pattern = re.compile(_trie_pattern(keys))
+    lookup = table.__getitem__
+
+    def replacer(text):
+        return pattern.sub(lambda m: lookup(m.group(0)), text)
+
+    return replacer
+
+
+# Compiled replacers keyed by dictionary identity: id(dic) -> (dic, replacer)
+_replacers = {}
+_replacers_max = 32
+
+
+def get_replacer(dic):
+    """
+    ==================================================================
+
+    🏷 Returns cached compiled replacer for a dictionary
+
+    Cache is keyed by dictionary identity, so the same dict object is
+    compiled only once. Changes of the dictionary in place are not seen,
+    after them call clear_replacers() (or pass a new dict).
+
+    📌 ARGUMENTS:
+    ―――――――――――――――――――――――――――――
+    - dic  (dictionary) Replace dictionary
+
+    🎯 RETURNS
+    ―――――――――――――――――――――――――――――
+    → Compiled replacer (see compile_replacer)
+    """
+
+    hit = _replacers.get(id(dic))
+    if hit is not None and hit[0] is dic:
+        return hit[1]
+
+    if len(_replacers) >= _replacers_max:
+        _replacers.pop(next(iter(_replacers)))
+
+    replacer = compile_replacer(dic)
+    # Keep reference to dic, so its id cannot be reused while cached
+    _replacers[id(dic)] = (dic, replacer)
+    return replacer
+
+
+def clear_replacers():
+    """
+    🏷 Clears the cache of compiled replacers
+    """
+
+    _replacers.clear()
+
+
+def replace_many(text, dic, **kwargs):
     """
     ==================================================================
 
@@ -228,17 +870,162 @@ def replace_many(text, dic):
     - text (str)        Text which will be changed
     - dic  (dictionary) Replace dictionary
 
+    - chained (int)     0 = Single pass, longest key wins (default)
+                        1 = Old behaviour, str.replace for every key in
+                            dictionary order (replacements can be replaced again)
+
+    Dictionary is compiled on every call. For many texts with the same
+    (big) dictionary use replace_many_series or get_replacer.
+
     🎯 RETURNS
     ―――――――――――――――――――――――――――――
     → New text
     """
 
-    for i, j in dic.items():
-        text = text.replace(i, j)
-    return text
+    chained = kwargs.get('chained', 0)
+
+    if chained:
+        for i, j in dic.items():
+            text = text.replace(i, j)
+        return text
+
+    return compile_replacer(dic)(text)
+
+
+def replace_many_series(s, dic):
+    """
+    ==================================================================
+
+    🏷 Multiple replacement over pandas Series (or any list of texts)
+
+    Replacement is done only once for every distinct value, then mapped
+    back to all rows. Missing values and non-text values are kept as they are.
+
+    📌 ARGUMENTS:
+    ―――――――――――――――――――――――――――――
+    - s    (Series)     Texts which will be changed
+    - dic  (dictionary) Replace dictionary
+
+    🎯 RETURNS
+    ―――――――――――――――――――――――――――――
+    → New Series with the same index
+    """
+
+    import numpy as np
+    import pandas as pd
+
+    if not isinstance(s, pd.Series):
+        s = pd.Series(s, dtype=object)
+
+    replacer = get_replacer(dic)
+
+    codes, uniques = pd.factorize(s)
+    if len(uniques) == 0:
+        return s.copy()
+
+    new_uniques = np.empty(len(uniques), dtype=object)
+    new_uniques[:] = [replacer(u) if isinstance(u, str) else u for u in uniques]
 
+    res = pd.Series(new_uniques.take(codes), index=s.index, name=s.name)
+    # factorize marks missing values with -1, put them back
+    na = codes == -1
+    if na.any():
+        res[na] = s[na]
 
-def fuzzy_compare_lists(source_list, match_list, limit_level, fast=0):
+    return res
+
+
+def fuzzy_processor(name):
+    """
+    =============================
+
+    🏷 Gets string preprocessing function for fuzzy matching by name
+
+    📌 ARGUMENTS:
+    ―――――――――――――――――――――――――――――
+    - name (str)  ''        = None, compare strings as they are
+                  'lower'   = lower case
+                  'strip'   = strip leading and trailing spaces
+                  'default' = rapidfuzz.utils.default_process
+                              (lower case, no punctuation, trimmed)
+      callable is returned as it is
+
+    🎯 RETURNS
+    ―――――――――――――――――――――――――――――
+    → Function or None
+    """
+
+    if callable(name) or not name:
+        return name or None
+    if name == 'lower':
+        return lambda x: str(x).lower()
+    if name == 'strip':
+        return lambda x: str(x).strip()
+    if name == 'default':
+        from rapidfuzz import utils
+        return utils.default_process
+
+    raise ValueError(f'Unknown fuzzy processor: {name}')
+
+
+def fuzzy_columns(limit_level):
+    """
+    🏷 Column names of fuzzy matching report
+    """
+
+    rc = ['Original']
+    dc = []
+    for r in range(limit_level):
+        dc.append(f'Match {r+1}')
+        dc.append(f'Score {r+1} [%]')
+
+    return rc + dc
+
+
+def fuzzy_top_k(scores, k, score_cutoff=0):
+    """
+    =============================
+
+    🏷 Best k scores in every row of a score matrix
+
+    Uses np.argpartition, so only k best columns are sorted.
+    Equal scores are ordered by position in the match list.
+
+    📌 ARGUMENTS:
+    ―――――――――――――――――――――――――――――
+    - scores       (ndarray)  2D matrix from rapidfuzz.process.cdist
+    - k            (int)      Number of best scores
+    - score_cutoff (int)      Scores under the cutoff are not valid
+
+    🎯 RETURNS
+    ―――――――――――――――――――――――――――――
+    → (indexes, scores, valid) - three 2D arrays with k columns
+    """
+
+    import numpy as np
+
+    n = scores.shape[1]
+    k = min(k, n)
+
+    if k < n:
+        top = np.argpartition(scores, n - k, axis=1)[:, n - k:]
+    else:
+        top = np.broadcast_to(np.arange(n), scores.shape).copy()
+
+    top_scores = np.take_along_axis(scores, top, axis=1)
+    order = np.lexsort((top, -top_scores), axis=1)
+    top = np.take_along_axis(top, order, axis=1)
+    top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+    # cdist sets scores below score_cutoff to 0
+    valid = top_scores >= score_cutoff
+    if score_cutoff:
+        valid &= top_scores > 0
+
+    return top, top_scores, valid
+
+
+def fuzzy_compare_lists(source_list, match_list, limit_level, fast=0, **kwargs):
     """
     =============================
 
@@ -254,6 +1041,19 @@ def fuzzy_compare_lists(source_list, match_list, limit_level, fast=0):
     - limit_level (int)         and use n best scores
     - fast        (int)         scorer is fuzz.QRatio
 
+    - batch        (int)   0 = item by item (default)
+                           n = score blocks of n source items at once
+                               with process.cdist on all cores
+    - score_cutoff (int)   Worse matches are left empty (default 0)
+    - processor    (str)   '' | 'lower' | 'strip' | 'default' (see fuzzy_processor)
+    - workers      (int)   Cores used in batch mode, -1 = all (default)
+    - progress     (float) Seconds between progress log lines (default 5, 0 = off)
+    - index        (dict)  Blocking index from fuzzy_index(match_list). Only candidates
+                           sharing most n-grams with the item are scored.
+                           match_list can be None, indexed list is used.
+    - candidates   (int)   Candidates per item with index (default 200).
+                           More candidates = better recall, slower matching.
+
     🎯 RETURNS
     ―――――――――――――――――――――――――――――
     → DataFrame
@@ -263,41 +1063,501 @@ def fuzzy_compare_lists(source_list, match_list, limit_level, fast=0):
     import pandas as pd
     from rapidfuzz import process, fuzz
 
+    batch = kwargs.get('batch', 0)
+    score_cutoff = kwargs.get('score_cutoff', 0)
+    processor = fuzzy_processor(kwargs.get('processor', ''))
+
     acc = [] #accumulator
     scorer_part = fuzz.WRatio
 
     if fast:
         scorer_part = fuzz.QRatio
 
+    if kwargs.get('index') is not None:
+        return _fuzzy_blocked(source_list, kwargs['index'], limit_level, scorer_part, score_cutoff,
+                              kwargs.get('candidates', 200), kwargs.get('progress', 5))
+
+    if batch:
+        return _fuzzy_batched(source_list, match_list, limit_level, scorer_part, processor, score_cutoff,
+                              batch, kwargs.get('workers', -1), kwargs.get('progress', 5))
+
+    p = tm.progress(len(source_list), 'Fuzzy matching', every=kwargs.get('progress', 5), logger=log)
+    debug = log.isEnabledFor(logging.DEBUG)
+
     for e,i in enumerate(source_list):
-        print(f'\nOriginal item: {i} | {e}/{len(source_list)}  {str(round(e/len(source_list)*100,2))}%)')
-        print('----------------------------------------------------------')
+        if debug:
+            log.debug(f'Original item: {i} | {e}/{len(source_list)}')
 
         row = []
         row.append(i)
 
-        res = process.extract(i, match_list, scorer=scorer_part, limit=limit_level)
+        res = process.extract(i, match_list, scorer=scorer_part, processor=processor,
+                              score_cutoff=score_cutoff or None, limit=limit_level)
 
         for e in range(limit_level):
-            row.append(res[e][0])
-            row.append(round(res[e][1],2))
-            print(str(round(res[e][1],2)), '% |', res[e][0])
+            if e < len(res):
+                row.append(res[e][0])
+                row.append(round(res[e][1],2))
+                if debug:
+                    log.debug(f'{round(res[e][1],2)} % | {res[e][0]}')
+            else:
+                row.append(None)
+                row.append(None)
 
         acc.append(row)
+        p.update()
 
-    rc = ['Original']
-    dc = []
-    for r in range(limit_level):
-        dc.append(f'Match {r+1}')
-        dc.append(f'Score {r+1} [%]')
+    p.close()
+    report = pd.DataFrame(acc, columns=fuzzy_columns(limit_level))
+
+    return report
+
+
+def _fuzzy_batched(source_list, match_list, limit_level, scorer, processor, score_cutoff, batch, workers, progress):
+    # Batched fuzzy matching: process.cdist over blocks of the source list,
+    # top-k with np.argpartition, result built column by column.
+
+    import numpy as np
+    import pandas as pd
+    from rapidfuzz import process
+
+    src = list(source_list)
+    choices = np.empty(len(match_list), dtype=object)
+    choices[:] = list(match_list)
 
-    final_cols = rc + dc
-    report = pd.DataFrame(acc, columns=final_cols)
+    # Missing values are skipped as in process.extract: no choice, no match for the item
+    choices = choices[~pd.isna(choices)]
+    src_na = np.empty(len(src), dtype=object)
+    src_na[:] = src
+    src_na = pd.isna(src_na)
+
+    if processor:
+        p_src = [None if na else processor(x) for x, na in zip(src, src_na)]
+        p_choices = [processor(x) for x in choices]
+    else:
+        p_src = src
+        p_choices = list(choices)
+
+    cols = fuzzy_columns(limit_level)
+    n = len(src)
+    if n == 0 or len(choices) == 0:
+        res = pd.DataFrame(columns=cols)
+        res['Original'] = src
+        return res
+
+    # Keep score matrix of one block under ~256 MB (float32)
+    rows = max(1, min(batch, (1 << 26) // len(choices)))
+
+    p = tm.progress(n, 'Fuzzy matching', every=progress, logger=log)
+    blocks = []
+
+    for b in range(0, n, rows):
+        ok = np.flatnonzero(~src_na[b:b+rows])
+        scores = process.cdist([p_src[b + j] for j in ok], p_choices, scorer=scorer,
+                               score_cutoff=score_cutoff or None, dtype=np.float32, workers=workers)
+        top, top_scores, valid = fuzzy_top_k(scores, limit_level, score_cutoff)
+
+        data = {'Original': src[b:b+rows]}
+        for r in range(limit_level):
+            m = np.full(len(data['Original']), None, dtype=object)
+            sc = np.full(len(data['Original']), np.nan)
+            if r < top.shape[1]:
+                m[ok] = np.where(valid[:, r], choices[top[:, r]], None)
+                sc[ok] = np.where(valid[:, r], np.round(top_scores[:, r].astype(np.float64), 2), np.nan)
+            data[f'Match {r+1}'] = m
+            data[f'Score {r+1} [%]'] = sc
+        blocks.append(pd.DataFrame(data, columns=cols))
+
+        p.update(len(data['Original']))
+
+    p.close()
+    report = pd.concat(blocks, ignore_index=True)
 
     return report
 
 
 
+def fuzzy_grams(text, n=3):
+    """
+    🏷 Set of character n-grams of a text padded with spaces
+    """
+
+    t = f' {text} '
+    if len(t) <= n:
+        return {t}
+    return {t[i:i+n] for i in range(len(t) - n + 1)}
+
+
+def fuzzy_index(match_list, n=3, processor='default'):
+    """
+    =============================
+
+    🏷 Builds a blocking index (character n-gram inverted index) over match list
+
+    Used in fuzzy_compare_lists(..., index=idx) to score only a small set
+    of candidates for every source item instead of the whole match list.
+    Build it once for the master list and keep it with fuzzy_index_save.
+
+    📌 ARGUMENTS:
+    ―――――――――――――――――――――――――――――
+    - match_list (list[str])  Items which will be matched
+    - n          (int)        Length of character n-grams (default 3)
+    - processor  (str)        Preprocessing name (see fuzzy_processor),
+                              the same is used for source items
+
+    🎯 RETURNS
+    ―――――――――――――――――――――――――――――
+    → Index (dict)
+    """
+
+    import numpy as np
+
+    if callable(processor):
+        raise ValueError('Index processor must be a name, so the index can be saved')
+
+    proc = fuzzy_processor(processor)
+    choices = list(match_list)
+    p_choices = [proc(x) for x in choices] if proc else [str(x) for x in choices]
+
+    postings = {}
+    for e, c in enumerate(p_choices):
+        for g in fuzzy_grams(c, n):
+            postings.setdefault(g, []).append(e)
+
+    grams = {g: np.array(ids, dtype=np.int32) for g, ids in postings.items()}
+
+    return {'n': n, 'processor': processor, 'choices': choices, 'p_choices': p_choices, 'grams': grams}
+
+
+def fuzzy_index_save(index, fn):
+    """
+    🏷 Saves blocking index to a pickle file
+    """
+
+    import pickle
+
+    with open(fn, 'wb') as f:
+        pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL)
+    log.info(f'✔ Fuzzy index saved: 💾 {fn}')
+
+
+def fuzzy_index_load(fn):
+    """
+    🏷 Loads blocking index from a pickle file
+    """
+
+    import pickle
+
+    with open(fn, 'rb') as f:
+        return pickle.load(f)
+
+
+def fuzzy_candidates(index, item, candidates=200):
+    """
+    =============================
+
+    🏷 Gets candidates from blocking index for one (processed) item
+
+    📌 ARGUMENTS:
+    ―――――――――――――――――――――――――――――
+    - index      (dict) Index from fuzzy_index
+    - item       (str)  Already processed text
+    - candidates (int)  Maximum number of candidates
+
+    🎯 RETURNS
+    ―――――――――――――――――――――――――――――
+    → Positions in match list (ndarray), most shared n-grams first
+    """
+
+    import numpy as np
+
+    grams = index['grams']
+    hits = [grams[g] for g in fuzzy_grams(item, index['n']) if g in grams]
+    if not hits:
+        return np.empty(0, dtype=np.int32)
+
+    counts = np.bincount(np.concatenate(hits))
+    found = np.flatnonzero(counts)
+
+    if len(found) > candidates:
+        found = found[np.argpartition(counts[found], len(found) - candidates)[len(found) - candidates:]]
+
+    return found[np.argsort(-counts[found], kind='stable')]
+
+
+def _fuzzy_blocked(source_list, index, limit_level, scorer, score_cutoff, candidates, progress):
+    # Fuzzy matching of every source item only against candidates from blocking index
+
+    import pandas as pd
+    from rapidfuzz import process
+
+    proc = fuzzy_processor(index['processor'])
+    choices = index['choices']
+    p_choices = index['p_choices']
+
+    src = list(source_list)
+    n = len(src)
+    p = tm.progress(n, 'Fuzzy matching', every=progress, logger=log)
+    acc = []
+
+    for e, i in enumerate(src):
+        q = proc(i) if proc else str(i)
+        cand = fuzzy_candidates(index, q, candidates)
+
+        row = [i]
+        res = process.extract(q, [p_choices[c] for c in cand], scorer=scorer, processor=None,
+                              score_cutoff=score_cutoff or None, limit=limit_level) if len(cand) else []
+        for r in range(limit_level):
+            if r < len(res):
+                row.append(choices[cand[res[r][2]]])
+                row.append(round(res[r][1],2))
+            else:
+                row.append(None)
+                row.append(None)
+        acc.append(row)
+
+        p.update()
+
+    p.close()
+    return pd.DataFrame(acc, columns=fuzzy_columns(limit_level))
+
+
+def fuzzy_index_recall(source_list, match_list, limit_level, **kwargs):
+    """
+    =============================
+
+    🏷 Benchmark of blocking index against exhaustive fuzzy matching
+
+    Runs fuzzy_compare_lists in batch mode (all pairs) and with the index
+    for every given number of candidates. Recall is the share of exhaustive
+    top matches which were found with the index too.
+
+    📌 ARGUMENTS:
+    ―――――――――――――――――――――――――――――
+    - source_list (list[str])
+    - match_list  (list[str])
+    - limit_level (int)
+
+    - candidates (list[int]) Candidate sizes to test (default [50, 200, 1000])
+    - index      (dict)      Existing index, otherwise it is built here
+    - fast, processor, n     Passed to fuzzy_compare_lists / fuzzy_index
+
+    🎯 RETURNS
+    ―――――――――――――――――――――――――――――
+    → DataFrame with recall and timing for every candidate size
+    """
+
+    import pandas as pd
+    from timeit import default_timer as timer
+
+    cand_list = kwargs.get('candidates', [50, 200, 1000])
+    fast = kwargs.get('fast', 0)
+    processor = kwargs.get('processor', 'default')
+
+    t = timer()
+    index = kwargs.get('index')
+    if index is None:
+        index = fuzzy_index(match_list, kwargs.get('n', 3), processor)
+    index_time = timer() - t
+
+    t = timer()
+    full = fuzzy_compare_lists(source_list, index['choices'], limit_level, fast, batch=1000,
+                               processor=index['processor'], progress=0)
+    full_time = timer() - t
+
+    def found(report, r):
+        return set(zip(report.index, report[f'Match {r}'])) - {(i, None) for i in report.index}
+
+    expected = set()
+    for r in range(1, limit_level + 1):
+        expected |= found(full, r)
+
+    acc = [['exhaustive', 1.0, 1.0, round(full_time, 3), 0.0]]
+    for c in cand_list:
+        t = timer()
+        rep = fuzzy_compare_lists(source_list, None, limit_level, fast, index=index, candidates=c, progress=0)
+        blocked_time = timer() - t
+
+        got = set()
+        for r in range(1, limit_level + 1):
+            got |= found(rep, r)
+        top1 = (rep['Match 1'] == full['Match 1']).mean() if len(rep) else 1.0
+
+        acc.append([c, round(len(got & expected) / max(len(expected), 1), 4), round(float(top1), 4),
+                    round(blocked_time, 3), round(index_time, 3)])
+
+    return pd.DataFrame(acc, columns=['Candidates', 'Recall', 'Top 1 match', 'Time [s]', 'Index time [s]'])
+
+
+
+def fuzzy_compare_cached(source_list, match_list, limit_level, cache_fn, fast=0, **kwargs):
+    """
+    =============================
+
+    🏷 fuzzy_compare_lists with persistent score cache in SQLite file
+
+    Best matches of every source item are stored together with the version
+    of the match list they were scored against. On the next run:
+    - new source items are scored against the whole match list
+    - cached items are scored only against match items added since then
+      and merged with cached best matches
+    - cached items whose best matches were removed from match list are scored again
+
+    Cache is cleared when limit_level, fast, score_cutoff or processor change.
+
+    📌 ARGUMENTS:
+    ―――――――――――――――――――――――――――――
+    - source_list (list[str])  Items that we will comapre
+    - match_list  (list[str])  ...with items from this list
+    - limit_level (int)        and use n best scores
+    - cache_fn    (Path)       SQLite cache file (created if missing)
+    - fast        (int)        scorer is fuzz.QRatio
+
+    - score_cutoff (int)  See fuzzy_compare_lists
+    - processor    (str)  See fuzzy_processor (name only)
+    - batch        (int)  Block size for scoring (default 1000)
+    - workers      (int)  Cores used for scoring, -1 = all (default)
+
+    🎯 RETURNS
+    ―――――――――――――――――――――――――――――
+    → DataFrame (same layout as fuzzy_compare_lists)
+    """
+
+    import json
+    import sqlite3
+    import pandas as pd
+
+    score_cutoff = kwargs.get('score_cutoff', 0)
+    processor = kwargs.get('processor', '')
+    opts = {'batch': kwargs.get('batch', 1000), 'workers': kwargs.get('workers', -1),
+            'score_cutoff': score_cutoff, 'processor': processor, 'progress': 0}
+
+    if callable(processor):
+        raise ValueError('Cached fuzzy matching needs processor name, not a function')
+
+    settings = json.dumps({'limit_level': limit_level, 'fast': int(bool(fast)),
+                           'score_cutoff': score_cutoff, 'processor': processor}, sort_keys=True)
+
+    conn = sqlite3.connect(cache_fn)
+    c = conn.cursor()
+    c.executescript("""
+        CREATE TABLE IF NOT EXISTS meta    (key TEXT PRIMARY KEY, value TEXT);
+        CREATE TABLE IF NOT EXISTS choices (item TEXT PRIMARY KEY, version INTEGER NOT NULL);
+        CREATE TABLE IF NOT EXISTS sources (source TEXT PRIMARY KEY, version INTEGER NOT NULL);
+        CREATE TABLE IF NOT EXISTS results (source TEXT NOT NULL, rank INTEGER NOT NULL,
+                                            item TEXT NOT NULL, score REAL NOT NULL,
+                                            PRIMARY KEY (source, rank));
+        CREATE INDEX IF NOT EXISTS results_item ON results(item);
+    """)
+
+    row = c.execute("SELECT value FROM meta WHERE key = 'settings'").fetchone()
+    if row is None or row[0] != settings:
+        c.executescript('DELETE FROM choices; DELETE FROM sources; DELETE FROM results; DELETE FROM meta;')
+        c.execute("INSERT INTO meta VALUES ('settings', ?)", (settings,))
+        c.execute("INSERT INTO meta VALUES ('version', '0')")
+    version = int(c.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()[0])
+
+    # Sync match list with cached version
+    #------------------------------------
+    choices = list(dict.fromkeys(match_list))
+    old = {i for (i,) in c.execute('SELECT item FROM choices')}
+    new = set(choices)
+    added = [x for x in choices if x not in old]
+    removed = list(old - new)
+
+    if added or removed:
+        version += 1
+        c.execute("UPDATE meta SET value = ? WHERE key = 'version'", (str(version),))
+
+    if removed:
+        c.execute('CREATE TEMP TABLE removed (item TEXT PRIMARY KEY)')
+        c.executemany('INSERT INTO removed VALUES (?)', [(x,) for x in removed])
+        c.execute('DELETE FROM sources WHERE source IN (SELECT r.source FROM results r JOIN removed USING (item))')
+        c.execute('DELETE FROM results WHERE source NOT IN (SELECT source FROM sources)')
+        c.execute('DELETE FROM choices WHERE item IN (SELECT item FROM removed)')
+        c.execute('DROP TABLE removed')
+
+    c.executemany('INSERT INTO choices VALUES (?, ?)', [(x, version) for x in added])
+
+    # Split source items to cached, outdated and new
+    #-----------------------------------------------
+    wanted = list(dict.fromkeys(source_list))
+    cached = dict(c.execute('SELECT source, version FROM sources'))
+    todo_new = [x for x in wanted if x not in cached]
+    todo_old = {}
+    for x in wanted:
+        v = cached.get(x)
+        if v is not None and v < version:
+            todo_old.setdefault(v, []).append(x)
+
+    def report_rows(report):
+        acc = []
+        for r in report.itertuples(index=False):
+            for k in range(limit_level):
+                m, sc = r[1 + 2*k], r[2 + 2*k]
+                if m is not None and sc == sc:
+                    acc.append((r[0], k, m, float(sc)))
+        return acc
+
+    if todo_new:
+        report = fuzzy_compare_lists(todo_new, choices, limit_level, fast, **opts) if choices else \
+                 pd.DataFrame({'Original': todo_new})
+        c.executemany('INSERT INTO results VALUES (?, ?, ?, ?)', report_rows(report) if choices else [])
+        c.executemany('INSERT INTO sources VALUES (?, ?)', [(x, version) for x in todo_new])
+
+    for v, items in todo_old.items():
+        fresh = [i for (i,) in c.execute('SELECT item FROM choices WHERE version > ?', (v,))]
+        if fresh:
+            report = fuzzy_compare_lists(items, fresh, limit_level, fast, **opts)
+            merged = {}
+            for src, _, m, sc in report_rows(report):
+                merged.setdefault(src, []).append((m, sc))
+
+            c.execute('CREATE TEMP TABLE todo (source TEXT PRIMARY KEY)')
+            c.executemany('INSERT INTO todo VALUES (?)', [(x,) for x in items])
+            for src, _, m, sc in c.execute('SELECT r.* FROM results r JOIN todo USING (source) ORDER BY r.source, r.rank').fetchall():
+                merged.setdefault(src, []).append((m, sc))
+            c.execute('DELETE FROM results WHERE source IN (SELECT source FROM todo)')
+            c.execute('DROP TABLE todo')
+
+            rows = []
+            for src, matches in merged.items():
+                matches.sort(key=lambda x: -x[1])
+                rows.extend((src, k, m, sc) for k, (m, sc) in enumerate(matches[:limit_level]))
+            c.executemany('INSERT INTO results VALUES (?, ?, ?, ?)', rows)
+
+        c.executemany('UPDATE sources SET version = ? WHERE source = ?', [(version, x) for x in items])
+
+    conn.commit()
+
+    # Collect report from cache
+    #--------------------------
+    c.execute('CREATE TEMP TABLE wanted (source TEXT PRIMARY KEY)')
+    c.executemany('INSERT INTO wanted VALUES (?)', [(x,) for x in wanted])
+    best = {}
+    for src, k, m, sc in c.execute('SELECT r.* FROM results r JOIN wanted USING (source)'):
+        best.setdefault(src, {})[k] = (m, sc)
+    c.close()
+    conn.close()
+
+    acc = []
+    for i in source_list:
+        row = [i]
+        b = best.get(i, {})
+        for k in range(limit_level):
+            m, sc = b.get(k, (None, None))
+            row.append(m)
+            row.append(sc)
+        acc.append(row)
+
+    n_old = sum(len(v) for v in todo_old.values())
+    log.info(f'Fuzzy cache: {len(wanted) - len(todo_new) - n_old} cached | {n_old} updated | {len(todo_new)} new '
+             f'| match list +{len(added)} -{len(removed)}')
+
+    return pd.DataFrame(acc, columns=fuzzy_columns(limit_level))
+
+
+
 # File functions
 #----------------------------------------------------------------
 
@@ -321,12 +1581,12 @@ def new_folder(folder, mode=0):
         folder.mkdir(parents=True, exist_ok=False)
     except FileExistsError:
         if mode:
-            print("Folder is already there")
+            log.info(f'Folder is already there: {folder}')
         else:
             pass
     else:
         if mode:
-            print("Folder was created")
+            log.info(f'Folder was created: {folder}')
         else:
             pass
 
@@ -349,18 +1609,200 @@ def get_file_list(path, extension, mode=0):
     → File list
     """
 
+    import os
+    from pathlib import Path
+
     file_list  = []
 
-    for f in path.glob(f'{extension}'):
-        if mode == 1:
-            file_list.append(f.name)
-        else:
-            file_list.append(f)
+    # Recursive or nested patterns are left to pathlib
+    if '/' in extension or '\\' in extension or '**' in extension:
+        for f in Path(path).glob(f'{extension}'):
+            if mode == 1:
+                file_list.append(f.name)
+            else:
+                file_list.append(f)
+        return file_list
+
+    pattern = _name_pattern([extension])
+    with os.scandir(path) as it:
+        for e in it:
+            if pattern(os.path.normcase(e.name)):
+                if mode == 1:
+                    file_list.append(e.name)
+                else:
+                    file_list.append(Path(e.path))
 
     return file_list
 
 
-def split_by_size(path, file_list, size):
+# Scanned file: full path (str), file name, size in bytes, modification time (timestamp)
+FileEntry = namedtuple('FileEntry', ['path', 'name', 'size', 'mtime'])
+
+
+def _name_pattern(patterns):
+    # One compiled matcher for many glob patterns (names are already os.path.normcase-d)
+    import re
+    import fnmatch
+    import os
+
+    if isinstance(patterns, str):
+        patterns = [patterns]
+    if not patterns:
+        return lambda name: False
+
+    rx = re.compile('|'.join(f'(?:{fnmatch.translate(os.path.normcase(p))})' for p in patterns))
+    return lambda name: rx.match(name) is not None
+
+
+def _scan_tree(root, top, match, match_rel, skip, skip_rel, recursive):
+    # Iterative os.scandir walk of one folder tree
+    import os
+
+    cut = len(root.rstrip('/\\')) + 1
+    stack = [top]
+
+    while stack:
+        d = stack.pop()
+        try:
+            it = os.scandir(d)
+        except OSError:
+            continue
+
+        with it:
+            for e in it:
+                name = os.path.normcase(e.name)
+                rel = e.path[cut:].replace('\\', '/')
+                if skip(name) or skip_rel(rel):
+                    continue
+                try:
+                    if e.is_dir(follow_symlinks=False):
+                        if recursive:
+                            stack.append(e.path)
+                        continue
+                    if not e.is_file():
+                        continue
+                    if match(name) or match_rel(rel):
+                        st = e.stat()
+                        yield FileEntry(e.path, e.name, st.st_size, st.st_mtime)
+                except OSError:
+                    continue
+
+
+def scan_files(path, patterns='*', **kwargs):
+    """
+    =============================
+
+    🏷 Fast recursive file scanner (os.scandir) with cached size and time
+
+    📌 ARGUMENTS:
+    ―――――――――――――――――――――――――――――
+    - path      (Path)       Root folder
+    - patterns  (str | list) Glob pattern(s) for file names, e.g. ['*.xlsx', '*.csv'].
+                             Patterns with / are matched against path relative to root.
+
+    - exclude   (list)  Glob pattern(s) of file or folder names to skip (e.g. ['.git', '~$*'])
+    - recursive (int)   1 = walk subfolders (default), 0 = only root folder
+    - workers   (int)   0 = one thread (default), n = scan subfolders of root in n threads
+    - lazy      (int)   1 = return generator, 0 = return list (default)
+
+    🎯 RETURNS
+    ―――――――――――――――――――――――――――――
+    → List (or generator) of FileEntry(path, name, size, mtime)
+    """
+
+    import os
+
+    if isinstance(patterns, str):
+        patterns = [patterns]
+    exclude = kwargs.get('exclude', [])
+    if isinstance(exclude, str):
+        exclude = [exclude]
+
+    recursive = kwargs.get('recursive', 1)
+    workers = kwargs.get('workers', 0)
+    root = str(path)
+
+    match = _name_pattern([p for p in patterns if '/' not in p])
+    match_rel = _name_pattern([p for p in patterns if '/' in p])
+    skip = _name_pattern([p for p in exclude if '/' not in p])
+    skip_rel = _name_pattern([p for p in exclude if '/' in p])
+    args = (match, match_rel, skip, skip_rel)
+
+    def parallel():
+        from concurrent.futures import ThreadPoolExecutor, as_completed
+
+        # Files in root here, every subfolder as a separate task
+        subdirs = []
+        for f in _scan_tree(root, root, *args, recursive=0):
+            yield f
+        with os.scandir(root) as it:
+            for e in it:
+                if e.is_dir(follow_symlinks=False) and not skip(os.path.normcase(e.name)) \
+                        and not skip_rel(e.name):
+                    subdirs.append(e.path)
+
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            tasks = [ex.submit(lambda d: list(_scan_tree(root, d, *args, recursive=1)), d) for d in subdirs]
+            for t in as_completed(tasks):
+                yield from t.result()
+
+    if workers and recursive:
+        res = parallel()
+    else:
+        res = _scan_tree(root, root, *args, recursive=recursive)
+
+    if kwargs.get('lazy', 0):
+        return res
+    return list(res)
+
+
+def scan_changes(path, snapshot_fn, patterns='*', **kwargs):
+    """
+    =============================
+
+    🏷 Scans folder and reports files changed since the last scan
+
+    Snapshot of the scan (path, size, time) is saved in a pickle file.
+    The first scan reports all files as added.
+
+    📌 ARGUMENTS:
+    ―――――――――――――――――――――――――――――
+    - path        (Path)        Root folder
+    - snapshot_fn (Path)        Snapshot file (created or replaced)
+    - patterns    (str | list)  See scan_files
+    - **kwargs                  exclude, recursive, workers (see scan_files)
+
+    🎯 RETURNS
+    ―――――――――――――――――――――――――――――
+    → dict: added, changed (lists of FileEntry), removed (list of paths)
+    """
+
+    import os
+    import pickle
+
+    kwargs['lazy'] = 0
+    entries = scan_files(path, patterns, **kwargs)
+
+    old = {}
+    if os.path.exists(snapshot_fn):
+        with open(snapshot_fn, 'rb') as f:
+            old = pickle.load(f)
+
+    new = {e.path: (e.size, e.mtime) for e in entries}
+
+    added = [e for e in entries if e.path not in old]
+    changed = [e for e in entries if e.path in old and old[e.path] != (e.size, e.mtime)]
+    removed = [p for p in old if p not in new]
+
+    tmp = str(snapshot_fn) + '.tmp'
+    with open(tmp, 'wb') as f:
+        pickle.dump(new, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, snapshot_fn)
+
+    return {'added': added, 'changed': changed, 'removed': removed}
+
+
+def split_by_size(path, file_list, size, **kwargs):
     """
     =============================
 
@@ -369,82 +1811,326 @@ def split_by_size(path, file_list, size):
     📌 ARGUMENTS:
     ―――――――――――――――――――――――――――――
     - path      (Path)
-    - file_list (list[str])
-    - size      (int)       Desired size
+    - file_list (list[str])   File names in path or FileEntry items from scan_files
+                              (their size is used without reading it again)
+    - size      (int)         Desired size in MB
+
+    - mode      (str)  greedy   = collect files in list order until size is reached (default)
+                       ffd      = first-fit decreasing, the biggest files first,
+                                  each into the first list where it fits under size
+                       balanced = split into `bins` lists of almost the same size
+    - bins      (int)  Number of lists for balanced mode (size is not used)
+    - workers   (int)  Threads for reading file sizes (default 8)
+    - stats     (int)  1 = return (lists, statistics dict)
 
     🎯 RETURNS
     ―――――――――――――――――――――――――――――
     → a list with splitted sublists
     """
 
+    import heapq
     from pathlib import Path
-    # Accumulator
-    acc = 0
+    from concurrent.futures import ThreadPoolExecutor
+
+    mode = kwargs.get('mode', 'greedy')
+    workers = kwargs.get('workers', 8)
+    limit = int(size * 1024 * 1024) if size else 0
+
+    # File sizes in bytes
+    #---------------------
+    def file_size(f):
+        if isinstance(f, FileEntry):
+            return f.size
+        return Path(path / f).stat().st_size
+
+    if workers > 1 and not all(isinstance(f, FileEntry) for f in file_list):
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            sizes = list(ex.map(file_size, file_list))
+    else:
+        sizes = [file_size(f) for f in file_list]
 
-    chunk_list = []
     global_list = []
 
-    for f in file_list:
-        fp = Path(path / f)
-        file_size = fp.stat().st_size
-        file_size_MB = round(file_size/1024/1024,2)
-        acc = acc + file_size_MB
-        print('Size:',file_size_MB,'MB', '📦', round(acc,2),'MB', '💾', fp.name)
+    if mode == 'greedy':
+        # Accumulator
+        acc = 0
+        chunk_list = []
+        bin_sizes = []
 
-        if acc < size:
+        for f, n in zip(file_list, sizes):
+            acc = acc + n
             chunk_list.append(f)
-            print('✔ Collecting more...')
-        else:
-            print('❌ Stop collecting ❌')
-            chunk_list.append(f) # Get last element after full list
-            global_list.append(chunk_list) # Add to global list
-            # Reset chunk accumulator and list
-            acc = 0
-            chunk_list=[]
 
+            if acc >= limit:
+                global_list.append(chunk_list) # Add to global list
+                bin_sizes.append(acc)
+                # Reset chunk accumulator and list
+                acc = 0
+                chunk_list = []
+
+        if chunk_list:
+            # Last chunk, even if it is not full
+            global_list.append(chunk_list)
+            bin_sizes.append(acc)
+
+    elif mode == 'ffd':
+        order = sorted(range(len(file_list)), key=lambda i: -sizes[i])
+        bin_sizes = []
+        for i in order:
+            for b, used in enumerate(bin_sizes):
+                if used + sizes[i] <= limit:
+                    global_list[b].append(file_list[i])
+                    bin_sizes[b] += sizes[i]
+                    break
+            else:
+                global_list.append([file_list[i]])
+                bin_sizes.append(sizes[i])
+
+    elif mode == 'balanced':
+        bins = kwargs.get('bins', 0)
+        if bins < 1:
+            raise ValueError('balanced mode needs bins=n')
+
+        # Biggest file first into the least full list
+        global_list = [[] for _ in range(bins)]
+        bin_sizes = [0] * bins
+        heap = [(0, b) for b in range(bins)]
+        for i in sorted(range(len(file_list)), key=lambda i: -sizes[i]):
+            used, b = heapq.heappop(heap)
+            global_list[b].append(file_list[i])
+            bin_sizes[b] = used + sizes[i]
+            heapq.heappush(heap, (bin_sizes[b], b))
+
+    else:
+        raise ValueError(f'Unknown mode: {mode}')
+
+    mb = [round(x / 1024 / 1024, 2) for x in bin_sizes]
+    mean = sum(bin_sizes) / len(bin_sizes) if bin_sizes else 0
+    info = {
+        'files':     len(file_list),
+        'lists':     len(global_list),
+        'total_MB':  round(sum(bin_sizes) / 1024 / 1024, 2),
+        'min_MB':    min(mb) if mb else 0,
+        'max_MB':    max(mb) if mb else 0,
+        'mean_MB':   round(mean / 1024 / 1024, 2),
+        'imbalance': round(max(bin_sizes) / mean, 3) if mean else 0,
+        'sizes_MB':  mb,
+    }
+    log.info(f"📦 {info['files']} files → {info['lists']} lists ({mode}) | {info['total_MB']} MB | "
+             f"min {info['min_MB']} / mean {info['mean_MB']} / max {info['max_MB']} MB")
+
+    if kwargs.get('stats', 0):
+        return global_list, info
     return global_list
 
 
-def cp_multi_2_one(file_list, dst_path):
+def copy_file(src, dst):
+    """
+    =============================
+
+    🏷 Copies one file with kernel-side copying where possible
+
+    os.copy_file_range (Linux) is tried first, then shutil.copyfile
+    (which uses sendfile / fcopyfile / CopyFile where available).
+    Modification time is kept, so later runs can skip identical files.
+
+    📌 ARGUMENTS:
+    ―――――――――――――――――――――――――――――
+    - src (Path)  Source file
+    - dst (Path)  Destination file
+
+    🎯 RETURNS
+    ―――――――――――――――――――――――――――――
+    → Number of copied bytes
+    """
+
+    import os
+    import shutil
+
+    size = os.stat(src).st_size
+    done = False
+
+    if hasattr(os, 'copy_file_range') and size:
+        try:
+            with open(src, 'rb') as fs, open(dst, 'wb') as fd:
+                left = size
+                while left > 0:
+                    n = os.copy_file_range(fs.fileno(), fd.fileno(), min(left, 1 << 30))
+                    if n == 0:
+                        break
+                    left -= n
+            done = left == 0
+        except OSError:
+            done = False
+
+    if not done:
+        shutil.copyfile(src, dst)
+
+    shutil.copystat(src, dst)
+    return size
+
+
+def same_file_content(a, b, check='size'):
+    """
+    =============================
+
+    🏷 Checks if two files are identical
+
+    📌 ARGUMENTS:
+    ―――――――――――――――――――――――――――――
+    - a, b  (Path)
+    - check (str)   size = same size and modification time (2 s tolerance)
+                    hash = same size and BLAKE2 hash of content
+
+    🎯 RETURNS
+    ―――――――――――――――――――――――――――――
+    → True or False
+    """
+
+    import os
+
+    try:
+        sa, sb = os.stat(a), os.stat(b)
+    except OSError:
+        return False
+
+    if sa.st_size != sb.st_size:
+        return False
+
+    if check == 'hash':
+        return file_hash(a) == file_hash(b)
+
+    return abs(sa.st_mtime - sb.st_mtime) <= 2
+
+
+def file_hash(fn, chunk=1 << 20):
+    """
+    🏷 BLAKE2b hash (hex) of file content
+    """
+
+    import hashlib
+
+    h = hashlib.blake2b()
+    with open(fn, 'rb') as f:
+        for block in iter(lambda: f.read(chunk), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def cp_multi_2_one(file_list, dst_path, **kwargs):
     """
     =============================
 
     🏷 Copy files from many different folders to one destination folder.
 
+    Files are copied in parallel threads. Files which are already in
+    destination folder with the same content are skipped.
+
     📌 ARGUMENTS:
     ―――――――――――――――――――――――――――――
     - file_list (list[str])
     - dst_path  (Path)      Destination path
 
+    - workers   (int)  Parallel copies (default 8)
+    - check     (str)  size (default) = skip files with the same size and modification time
+                       hash           = skip files with the same content hash
+    - collision (str)  Same file name from different source folders:
+                       rename (default) = name (1).ext, name (2).ext, ...
+                       skip             = copy only the first one
+                       overwrite        = the last one wins (only it is copied)
+
     🎯 RETURNS
     ―――――――――――――――――――――――――――――
-    → All files in one folder
+    → All files in one folder and summary (dict)
     """
 
-    import shutil
-    from shutil import SameFileError
+    import os
     from pathlib import Path
-
-    cn = 0
-    err = []
-    print('⚙⚙⚙ Copying in process ⚙⚙⚙')
+    from concurrent.futures import ThreadPoolExecutor
+    from timeit import default_timer as timer
+
+    workers = kwargs.get('workers', 8)
+    check = kwargs.get('check', 'size')
+    collision = kwargs.get('collision', 'rename')
+
+    dst_path = Path(dst_path)
+    start = timer()
+
+    # Assign destination names first, so the result does not depend on thread timing
+    #-------------------------------------------------------------------------------
+    jobs = {}       # lower case destination name -> (file, source, destination)
+    seen = set()
+    taken = {}
+    skipped = []
+    replaced = []   # overwrite: sources replaced by a later one with the same name
     for f in file_list:
         src = Path(f)
-
+        key = os.path.normcase(os.path.abspath(src))
+        if key in seen:
+            continue
+        seen.add(key)
+
+        name = src.name
+        lname = name.lower()
+        if lname in taken:
+            if collision == 'skip':
+                skipped.append(f)
+                continue
+            if collision == 'overwrite':
+                # One job per destination, so only the last source is copied and checked
+                replaced.append(jobs.pop(lname)[0])
+            if collision == 'rename':
+                n = taken[lname]
+                while True:
+                    n += 1
+                    name = f'{src.stem} ({n}){src.suffix}'
+                    if name.lower() not in taken:
+                        break
+                taken[lname] = n
+                lname = name.lower()
+        taken.setdefault(lname, 0)
+        jobs[lname] = (f, src, dst_path / name)
+    jobs = list(jobs.values())
+
+    def copy_job(job):
+        f, src, dst = job
         try:
-            shutil.copy(src, dst_path)
-            print('🎯 Not existing file...', f)
-            cn = cn + 1
-        except SameFileError:
-            print("➡ Skipping...Existing file", f)
-            err.append(f)
-        except:
-            print("❌❌❌ Unknown error ❌❌❌", f)
-            err.append(f)
-
-    print('⚡⚡⚡  Copying is DONE!  ⚡⚡⚡')
-    print(f'\n{cn} files successfully copied!')
-
-    print(f'\n{str(len(err))} These files are not copied:')
-    for e in err:
-        print(e)
+            if os.path.exists(dst) and os.path.samefile(src, dst):
+                return f, 'skipped', 0
+            if same_file_content(src, dst, check):
+                return f, 'skipped', 0
+            return f, 'copied', copy_file(src, dst)
+        except Exception as ex:
+            return f, ex, 0
+
+    log.info(f'⚙ Copying {len(jobs)} files with {workers} workers')
+    p = tm.progress(len(jobs), 'Copying', unit='files', logger=log)
+
+    copied = 0
+    size = 0
+    err = []
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        for f, status, n in ex.map(copy_job, jobs):
+            if status == 'copied':
+                copied += 1
+                size += n
+            elif status == 'skipped':
+                skipped.append(f)
+            else:
+                err.append((f, status))
+            p.update()
+
+    elapsed = timer() - start
+    mb = size / 1024 / 1024
+
+    log.info(f'⚡ Copying is DONE! {copied} files copied ({round(mb, 2)} MB in {round(elapsed, 2)} s | '
+             f'{round(mb / max(elapsed, 1e-9), 2)} MB/s), {len(skipped)} files skipped (already there)'
+             f"{f', {len(replaced)} replaced by a later file with the same name' if replaced else ''}")
+
+    if err:
+        log.warning(f'{len(err)} files are not copied:')
+        for f, e in err:
+            log.warning(f'{f} | {e}')
+
+    return {'copied': copied, 'skipped': len(skipped), 'replaced': len(replaced), 'failed': err,
+            'bytes': size, 'seconds': elapsed}
@@ -0,0 +1,471 @@
+# coding=utf-8
+# Python 3
+
+"""
+🏷️ TIMING AND MEMORY INSTRUMENTATION
+👔 Igor Perković
+
+🚀 Created: 2026-10-19 12:20:14
+📅 Changed: 2026-10-20 10:02:45
+
+⚙️ Prerequisites:
+------------------------------
+    Standard library only
+
+📃 Description:
+--------------------------------------------------------------------------
+Opt-in measurement of wall time, CPU time, rows, bytes and peak memory
+per call. Every measurement is a record (dict) sent to sinks: logging
+(default), a callback or a JSON lines file.
+
+    import tm
+    tm.enable(sink=tm.json_sink('etl_metrics.jsonl'))   # wraps du, fi, db, up
+    ...
+    tm.disable()                                        # original functions back
+
+    with tm.track('load customers') as t:
+        ...
+        t.add(rows=len(df))
+
+    @tm.timed
+    def my_step(...): ...
+
+progress is a shared reporter for long loops, it logs at most one line
+every few seconds with rate and ETA.
+
+enable() replaces public functions of the modules with measured wrappers
+and disable() puts the originals back, so there is no overhead when it
+is off. Functions decorated with @timed only check one flag when off.
+
+Peak memory comes from tracemalloc (Python allocations, also NumPy arrays)
+and it is process wide, so allocations of other threads running at the
+same time are counted too. Generator functions are not wrapped.
+
+tracemalloc slows allocations down, use memory=False for timings only.
+
+"""
+import os
+import json
+import time
+import logging
+import inspect
+import functools
+import threading
+import tracemalloc
+from datetime import datetime, timedelta
+
+
+log = logging.getLogger(__name__)
+
+_sinks = []         # functions receiving records
+_enabled = False    # @timed measures only when enabled
+_memory = True      # default for peak memory tracing
+_wrapped = {}       # (module, name) -> original function
+_local = threading.local()  # per thread: stack of open track() blocks with memory tracing
+_lock = threading.Lock()    # starting, resetting and stopping tracemalloc
+_active = set()             # open track() blocks with memory tracing in all threads
+_own_tracing = False        # tracemalloc was started here (not by the user)
+
+
+# Sinks
+#--------------------------------------------------
+def log_sink(level=logging.INFO, logger=None):
+    """
+    🏷 Sink writing one log line per record
+    """
+    logger = logger or log
+
+    def sink(r):
+        peak = f", peak {r['peak_mb']} MB" if r['peak_mb'] is not None else ''
+        logger.log(level, f"{r['name']}: {r['wall']} s (cpu {r['cpu']} s), {r['rows']} rows, "
+                          f"{r['bytes']} bytes{peak}{', ERROR ' + r['error'] if r['error'] else ''}")
+    return sink
+
+
+def json_sink(fn):
+    """
+    🏷 Sink appending records to JSON lines file (one JSON object per line)
+    """
+    lock = threading.Lock()
+
+    def sink(r):
+        line = json.dumps(r, default=str)
+        with lock, open(fn, 'a', encoding='utf-8') as f:
+            f.write(line + '\n')
+    return sink
+
+
+def add_sink(sink):
+    # sink = function(record)
+    _sinks.append(sink)
+    return sink
+
+
+def remove_sink(sink):
+    if sink in _sinks:
+        _sinks.remove(sink)
+
+
+def clear_sinks():
+    _sinks.clear()
+
+
+def emit(record):
+    # Send record to all sinks, a broken sink must not break the measured code
+    for s in list(_sinks or [log_sink()]):
+        try:
+            s(record)
+        except Exception as ex:
+            log.warning(f'Metrics sink failed: {ex}')
+
+
+# Measuring
+#--------------------------------------------------
+class track:
+    """
+    ==================================================
+
+    🏷 Context manager measuring a block of code
+
+    📌 ARGUMENTS:
+    ――――――――――――――――――――――――――――――――――――――――――――――――――
+    - name    (str)  Name in the record
+    - rows    (int)  Processed rows, can be added later with add()
+    - bytes   (int)  Read or written bytes, can be added later with add()
+    - memory  (bool) Measure peak memory with tracemalloc (default as in enable)
+    - extra   (dict) Additional fields for the record
+
+    🎯 RETURNS
+    ――――――――――――――――――――――――――――――――――――――――――――――――――
+    → Record (dict) in .record after the block, sent to sinks:
+      name, start, wall, cpu, rows, bytes, peak_mb, error, thread
+    """
+
+    def __init__(self, name, rows=0, bytes=0, memory=None, extra=None):
+        self.name = name
+        self.rows = rows
+        self.bytes = bytes
+        self.memory = _memory if memory is None else memory
+        self.extra = extra or {}
+        self.record = None
+
+    def add(self, rows=0, bytes=0):
+        self.rows += rows
+        self.bytes += bytes
+
+    def __enter__(self):
+        global _own_tracing
+
+        self._peak = 0
+        if self.memory:
+            with _lock:
+                if not tracemalloc.is_tracing():
+                    tracemalloc.start()
+                    _own_tracing = True
+                else:
+                    # Open blocks (also in other threads) keep their peak before it is reset
+                    peak = tracemalloc.get_traced_memory()[1]
+                    for t in _active:
+                        t._peak = max(t._peak, peak)
+                self._base = tracemalloc.get_traced_memory()[0]
+                tracemalloc.reset_peak()
+                _active.add(self)
+            _stack().append(self)
+        self._start = datetime.now()
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter() - self._wall
+        cpu = time.process_time() - self._cpu
+
+        peak = None
+        if self.memory:
+            global _own_tracing
+
+            stack = _stack()
+            if self in stack:
+                stack.remove(self)
+            with _lock:
+                self._peak = max(self._peak, tracemalloc.get_traced_memory()[1])
+                _active.discard(self)
+                if stack:
+                    stack[-1]._peak = max(stack[-1]._peak, self._peak)
+                if not _active and _own_tracing:
+                    tracemalloc.stop()
+                    _own_tracing = False
+            peak = round(max(self._peak - self._base, 0) / 2**20, 3)
+
+        self.record = {'name': self.name, 'start': self._start.strftime('%Y-%m-%d %H:%M:%S.%f'),
+                       'wall': round(wall, 6), 'cpu': round(cpu, 6),
+                       'rows': self.rows, 'bytes': self.bytes, 'peak_mb': peak,
+                       'error': f'{exc_type.__name__}: {exc}' if exc_type else '',
+                       'thread': threading.current_thread().name, **self.extra}
+        emit(self.record)
+        return False
+
+
+def _stack():
+    # Open track() blocks of the current thread
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def _paths(args, kwargs):
+    # Arguments which can be file paths (checked after the call)
+    return [a for a in list(args) + list(kwargs.values())
+            if isinstance(a, os.PathLike) or (isinstance(a, str) and 0 < len(a) < 4096)]
+
+
+def _file_bytes(paths):
+    total = 0
+    for p in paths:
+        try:
+            if os.path.isfile(p):
+                total += os.path.getsize(p)
+        except (OSError, ValueError):
+            pass
+    return total
+
+
+def _rows(res):
+    # Rows from DataFrame, array, list of DataFrames or list
+    if hasattr(res, 'shape') and len(getattr(res, 'shape', ())):
+        return int(res.shape[0])
+    if isinstance(res, (list, tuple)):
+        if res and all(hasattr(x, 'shape') for x in res):
+            return int(sum(x.shape[0] for x in res))
+        return len(res)
+    return 0
+
+
+def _measured(func, name=None, memory=None, check=False):
+    # Wrapper measuring every call of func (check = only when enabled)
+    name = name or f'{func.__module__}.{func.__qualname__}'
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if check and not _enabled:
+            return func(*args, **kwargs)
+        paths = _paths(args, kwargs)
+        with track(name, memory=memory) as t:
+            res = func(*args, **kwargs)
+            # Writers return nothing, then rows of the input DataFrame are used
+            rows = _rows(res) or next((_rows(a) for a in args if hasattr(a, 'shape')), 0)
+            t.add(rows=rows, bytes=_file_bytes(paths))
+        return res
+
+    wrapper.__wrapped__ = func
+    return wrapper
+
+
+def timed(func=None, *, name=None, memory=None):
+    """
+    ==================================================
+
+    🏷 Decorator measuring a function when instrumentation is enabled
+
+    Rows are taken from the result (DataFrame, list of DataFrames, list)
+    or from the DataFrame argument, bytes are sizes of files given as
+    arguments (read or written).
+
+    📌 ARGUMENTS:
+    ――――――――――――――――――――――――――――――――――――――――――――――――――
+    - name    (str)  Name in the record (default module.function)
+    - memory  (bool) Measure peak memory (default as in enable)
+
+    Generator functions are returned unchanged: the call only creates
+    the generator, the work is done while it is consumed.
+    """
+    def wrap(f):
+        if inspect.isgeneratorfunction(f):
+            return f
+        return _measured(f, name, memory, check=True)
+
+    if func is None:
+        return wrap
+    return wrap(func)
+
+
+# Progress
+#--------------------------------------------------
+class progress:
+    """
+    ==================================================
+
+    🏷 Rate-limited progress reporter
+
+    Logs at most one line every `every` seconds with done items, rate
+    and ETA, and one line at the end. update() in a hot loop only adds
+    a number and reads the clock.
+
+        with tm.progress(len(items), 'Copying', unit='files') as p:
+            for i in items:
+                ...
+                p.update()
+
+    📌 ARGUMENTS:
+    ――――――――――――――――――――――――――――――――――――――――――――――――――
+    - total   (int)    Number of items (None = unknown, no ETA)
+    - name    (str)    Text at the beginning of the line
+    - every   (float)  Seconds between lines (default 5, 0 = no lines at all)
+    - unit    (str)    Name of items (default items)
+    - logger  (Logger) Logger for lines (default tm logger)
+    - level   (int)    Log level (default INFO)
+    """
+
+    def __init__(self, total=None, name='Progress', every=5.0, unit='items', logger=None, level=logging.INFO):
+        self.total = total
+        self.name = name
+        self.every = every or float('inf')
+        self.quiet = not every
+        self.unit = unit
+        self.logger = logger or log
+        self.level = level
+        self.done = 0
+        self._start = self._last = time.monotonic()
+
+    def update(self, n=1):
+        self.done += n
+        now = time.monotonic()
+        if now - self._last >= self.every:
+            self._last = now
+            self.report(now)
+
+    def report(self, now=None):
+        if not self.logger.isEnabledFor(self.level):
+            return
+        elapsed = (now or time.monotonic()) - self._start
+        rate = self.done / elapsed if elapsed > 0 else 0
+        if self.total:
+            eta = (self.total - self.done) / rate if rate else 0
+            self.logger.log(self.level, f'{self.name}: {self.done}/{self.total} {round(self.done / self.total * 100, 1)}% | '
+                                        f'{round(rate)} {self.unit}/s | ETA {timedelta(seconds=round(eta))}')
+        else:
+            self.logger.log(self.level, f'{self.name}: {self.done} {self.unit} | {round(rate)} {self.unit}/s')
+
+    def close(self):
+        if self.quiet:
+            return
+        elapsed = time.monotonic() - self._start
+        if self.logger.isEnabledFor(self.level):
+            self.logger.log(self.level, f'{self.name}: {self.done} {self.unit} done in {round(elapsed, 2)} s | '
+                                        f'{round(self.done / elapsed) if elapsed > 0 else 0} {self.unit}/s')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+# Switching on and off
+#--------------------------------------------------
+def _module(name):
+    import importlib
+
+    if __package__:
+        return importlib.import_module(f'{__package__}.{name}')
+    return importlib.import_module(name)
+
+
+def enable(modules=('du', 'fi', 'db', 'up'), sink=None, memory=True, names=None):
+    """
+    ==================================================
+
+    🏷 Switches instrumentation on
+
+    📌 ARGUMENTS:
+    ――――――――――――――――――――――――――――――――――――――――――――――――――
+    - modules (list) Modules whose public functions are measured
+                     (default du, fi, db, up; [] = only @timed and track)
+    - sink    (func) Sink added to sinks (default log_sink when there is none)
+    - memory  (bool) Measure peak memory (default True)
+    - names   (list) Measure only these function names
+
+    🎯 RETURNS
+    ――――――――――――――――――――――――――――――――――――――――――――――――――
+    → List of wrapped functions (module.name)
+    """
+    global _enabled, _memory
+
+    _enabled = True
+    _memory = memory
+    if sink is not None:
+        add_sink(sink)
+
+    res = []
+    for m in modules:
+        mod = _module(m) if isinstance(m, str) else m
+        for n, obj in list(vars(mod).items()):
+            if n.startswith('_') or (names and n not in names):
+                continue
+            if not callable(obj) or isinstance(obj, type) or getattr(obj, '__module__', None) != mod.__name__:
+                continue
+            # Generators: the call only creates them, measure their consumer with track()
+            if inspect.isgeneratorfunction(obj):
+                continue
+            if (mod.__name__, n) in _wrapped:
+                continue
+            _wrapped[(mod.__name__, n)] = obj
+            setattr(mod, n, _measured(obj, f'{m if isinstance(m, str) else mod.__name__}.{n}'))
+            res.append(f'{mod.__name__}.{n}')
+    return res
+
+
+def disable():
+    """
+    🏷 Switches instrumentation off and restores original functions
+    """
+    import sys
+
+    global _enabled
+
+    _enabled = False
+    for (m, n), f in _wrapped.items():
+        mod = sys.modules.get(m)
+        if mod is not None:
+            setattr(mod, n, f)
+    _wrapped.clear()
+
+
+def enabled():
+    return _enabled
+
+
+def summary(records):
+    """
+    ==================================================
+
+    🏷 Totals per name from a list of records (slowest first)
+
+    📌 ARGUMENTS:
+    ――――――――――――――――――――――――――――――――――――――――――――――――――
+    - records (list) Records collected with add_sink(list.append)
+                     or read from a JSON lines file
+
+    🎯 RETURNS
+    ――――――――――――――――――――――――――――――――――――――――――――――――――
+    → list of dicts: name, calls, wall, cpu, rows, bytes, peak_mb, rows/s
+    """
+    totals = {}
+    for r in records:
+        t = totals.setdefault(r['name'], {'name': r['name'], 'calls': 0, 'wall': 0.0, 'cpu': 0.0,
+                                          'rows': 0, 'bytes': 0, 'peak_mb': 0.0})
+        t['calls'] += 1
+        t['wall'] += r['wall']
+        t['cpu'] += r['cpu']
+        t['rows'] += r['rows']
+        t['bytes'] += r['bytes']
+        t['peak_mb'] = max(t['peak_mb'], r['peak_mb'] or 0)
+
+    res = sorted(totals.values(), key=lambda t: t['wall'], reverse=True)
+    for t in res:
+        t['wall'] = round(t['wall'], 6)
+        t['cpu'] = round(t['cpu'], 6)
+        t['rows/s'] = round(t['rows'] / t['wall']) if t['wall'] else 0
+    return res
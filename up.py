@@ -6,7 +6,7 @@
 👔 Igor Perković
 
 🚀 Created: 25.4.2018.
-📅 Changed: 2022-04-10 12:26:59
+📅 Changed: 2026-10-20 11:27:45
 
 ⚙️ Prerequisites:
 ------------------------------
@@ -22,9 +22,53 @@ In the second part, Decryption, this scripts reads keys and hashes from
 the database and decrypt previously encrypted text.
 
 """
-import urllib
+import time
+import logging
+import urllib.parse
 import sqlite3 as sq
-from cryptography.fernet import Fernet
+
+log = logging.getLogger(__name__)
+
+
+# Decrypted passwords cache: connection -> {ID: (expiry time, password)}
+_secrets = {}
+cache_ttl = 300     # seconds, 0 = no cache
+
+
+def _id(idn):
+    # IDs are integers, '1' and 1 are the same ID (as in the old query text)
+    if isinstance(idn, str) and idn.strip().lstrip('-').isdigit():
+        return int(idn)
+    return idn
+
+
+def clear_cache(conn=None, idn=None):
+    # Forget cached passwords: all, all from one connection, or one ID
+    if conn is None:
+        _secrets.clear()
+    elif idn is None:
+        _secrets.pop(conn, None)
+    else:
+        _secrets.get(conn, {}).pop(_id(idn), None)
+
+
+def _closed(conn):
+    try:
+        conn.in_transaction
+    except sq.ProgrammingError:
+        return True
+    return False
+
+
+def _purge(now):
+    # Drop expired passwords, and connections which are closed or have nothing cached,
+    # so passwords and connections are not kept in memory after cache_ttl
+    for conn in list(_secrets):
+        cache = _secrets[conn]
+        for k in [k for k, v in cache.items() if v[0] <= now]:
+            del cache[k]
+        if not cache or _closed(conn):
+            del _secrets[conn]
 
 
 # oooooooooooo                                                           .    o8o
@@ -38,7 +82,87 @@ from cryptography.fernet import Fernet
 #                                             `Y8P'       o888o
 #--------------------------------------------------------------------------------------------------------
 #
+def init_store(conn):
+    """
+    Creates password tables (about, keys, hash) with ID as primary key.
+    Existing tables created without a key get an index on ID.
+    """
+    c = conn.cursor()
+
+    c.executescript('''
+        CREATE TABLE IF NOT EXISTS about (ID INTEGER PRIMARY KEY, comment TEXT, timestamp TEXT);
+        CREATE TABLE IF NOT EXISTS keys  (ID INTEGER PRIMARY KEY, keys BLOB);
+        CREATE TABLE IF NOT EXISTS hash  (ID INTEGER PRIMARY KEY, hash BLOB);
+    ''')
+
+    for t in ('about', 'keys', 'hash'):
+        has_key = any(r[1] == 'ID' and r[5] for r in c.execute(f'PRAGMA table_info({t})'))
+        if not has_key:
+            c.execute(f'CREATE INDEX IF NOT EXISTS {t}_id ON {t}(ID);')
+
+    conn.commit()
+    c.close()
+
+
+def _encrypt(raw_password):
+    from cryptography.fernet import Fernet
+
+    new_key = Fernet.generate_key()
+    encrypted_pass = Fernet(new_key).encrypt(raw_password.encode('utf-8'))
+    return sq.Binary(new_key), sq.Binary(encrypted_pass)
+
+
+def new_passwords(conn, rows):
+    """
+    Bulk insert of many passwords in one transaction.
+    rows: [(ID, comment, password), ...]
+    """
+    about, keys, hashes = [], [], []
+    for idn, raw_comment, raw_password in rows:
+        k, h = _encrypt(raw_password)
+        about.append((idn, raw_comment))
+        keys.append((idn, k))
+        hashes.append((idn, h))
+
+    with conn:
+        c = conn.cursor()
+        c.executemany("INSERT INTO about(ID, comment, timestamp) VALUES (?, ?, DateTime('now'));", about)
+        c.executemany('INSERT INTO keys(ID, keys) VALUES (?,?);', keys)
+        c.executemany('INSERT INTO hash(ID, hash) VALUES (?,?);', hashes)
+        c.close()
+
+    for idn, _ in keys:
+        clear_cache(conn, idn)
+
+
+def rotate_passwords(conn, rows):
+    """
+    Bulk change of existing passwords (new key for every one) in one transaction.
+    rows: [(ID, password), ...]
+    """
+    ids, keys, hashes = [], [], []
+    for idn, raw_password in rows:
+        k, h = _encrypt(raw_password)
+        ids.append((idn,))
+        keys.append((idn, k))
+        hashes.append((idn, h))
+
+    with conn:
+        c = conn.cursor()
+        c.executemany('DELETE from keys WHERE ID = ?;', ids)
+        c.executemany('DELETE from hash WHERE ID = ?;', ids)
+        c.executemany('INSERT INTO keys(ID, keys) VALUES (?,?);', keys)
+        c.executemany('INSERT INTO hash(ID, hash) VALUES (?,?);', hashes)
+        c.executemany("UPDATE about SET timestamp = DateTime('now') WHERE ID = ?;", ids)
+        c.close()
+
+    for (idn,) in ids:
+        clear_cache(conn, idn)
+
+
 def new_password(conn, idn, raw_comment, raw_password):
+    from cryptography.fernet import Fernet
+
     c = conn.cursor()
 
     new_key = Fernet.generate_key()
@@ -47,7 +171,7 @@ def new_password(conn, idn, raw_comment, raw_password):
     encrypted_pass = cipher_suite.encrypt(raw_pass_binary)   #required to be bytes
 
     # Insert comment or description
-    c.execute(f"INSERT INTO about(ID, comment, timestamp) VALUES ({idn}, '{raw_comment}', DateTime('now'));")
+    c.execute("INSERT INTO about(ID, comment, timestamp) VALUES (?, ?, DateTime('now'));", (idn, raw_comment))
 
     # Insert keys
     insert_key = '''INSERT INTO keys(ID, keys) VALUES (?,?);'''
@@ -61,16 +185,18 @@ def new_password(conn, idn, raw_comment, raw_password):
 
     conn.commit()
     c.close()
+    clear_cache(conn, idn)
 
 def del_password(conn, idn):
     c = conn.cursor()
 
-    c.execute(f'DELETE from about WHERE ID = {idn};')
-    c.execute(f'DELETE from keys  WHERE ID = {idn};')
-    c.execute(f'DELETE from hash  WHERE ID = {idn};')
+    c.execute('DELETE from about WHERE ID = ?;', (idn,))
+    c.execute('DELETE from keys  WHERE ID = ?;', (idn,))
+    c.execute('DELETE from hash  WHERE ID = ?;', (idn,))
 
     conn.commit()
     c.close()
+    clear_cache(conn, idn)
 
 
 # oooooooooo.                                                           .    o8o
@@ -84,15 +210,8 @@ def del_password(conn, idn):
 #                                            `Y8P'       o888o
 #-------------------------------------------------------------------------------------------------------
 
-def get_password(conn, in_row):
-    c = conn.cursor()
-
-    c.execute(f'''SELECT * FROM keys WHERE ID={in_row} ''')
-    key=c.fetchone()[1]
-
-    c.execute(f'''SELECT * FROM hash WHERE ID={in_row} ''')
-    hashed_password=c.fetchone()[1]
-    c.close()
+def _decrypt(key, hashed_password):
+    from cryptography.fernet import Fernet
 
     # Use the key
     cipher_suite = Fernet(key)
@@ -103,6 +222,54 @@ def get_password(conn, in_row):
     real_password = str(decrypted_pass,'utf-8')
     return urllib.parse.quote_plus(real_password)
 
-    conn.commit()
+
+def get_passwords(conn, id_list, ttl=None):
+    """
+    Decrypted passwords for many IDs with one query.
+    Passwords are cached in memory for ttl seconds (default cache_ttl).
+
+    Returns dict {ID: password} with IDs as they were given,
+    missing IDs are left out.
+    """
+    ttl = cache_ttl if ttl is None else ttl
+    now = time.monotonic()
+    _purge(now)
+    cache = _secrets.get(conn, {})
+
+    res = {}
+    wanted = {}     # ID as stored -> IDs as given ('1' and 1)
+    for idn in dict.fromkeys(id_list):
+        wanted.setdefault(_id(idn), []).append(idn)
+
+    todo = []
+    for key, given in wanted.items():
+        hit = cache.get(key)
+        if hit is not None:
+            res.update(dict.fromkeys(given, hit[1]))
+        else:
+            todo.append(key)
+
+    c = conn.cursor()
+    # SQLite limits number of query parameters
+    for i in range(0, len(todo), 500):
+        part = todo[i:i+500]
+        marks = ','.join('?' * len(part))
+        c.execute(f'''SELECT k.ID, k.keys, h.hash
+                      FROM keys k JOIN hash h ON h.ID = k.ID
+                      WHERE k.ID IN ({marks})''', part)
+
+        for idn, key, hashed_password in c.fetchall():
+            password = _decrypt(key, hashed_password)
+            res.update(dict.fromkeys(wanted.get(_id(idn), [idn]), password))
+            if ttl:
+                _secrets.setdefault(conn, {})[_id(idn)] = (now + ttl, password)
     c.close()
 
+    return res
+
+
+def get_password(conn, in_row, ttl=None):
+    res = get_passwords(conn, [in_row], ttl)
+    if in_row not in res:
+        raise KeyError(f'Password ID {in_row} not found')
+    return res[in_row]